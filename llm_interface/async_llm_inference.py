@@ -1,25 +1,34 @@
 import asyncio
 import logging
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+from types import SimpleNamespace
 
 from llm_interface.llm_inference import (
-    add_metadata_to_llm_output,
+    LLMResult,
+    build_llm_output,
     prepare_llm_input_args,
+    record_llm_call,
+    to_raw_llm_input_args,
 )
-
-# Configure basic logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+from task_configs.config import LLM_RATE_LIMIT_CONFIG
+from utils.profiling import stage
+from utils.progress import get_progress
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
 async def generate_with_openai_async(
-    async_client, formatted_prompt_dict: dict, llm_input_args_config: dict
-) -> dict:
+    async_client,
+    formatted_prompt_dict: dict,
+    llm_input_args_config: dict,
+    return_model: bool = False,
+    offloader=None,
+    task: str = "default",
+    limiter=None,
+) -> dict | LLMResult:
     """
     Generate goals using OpenAI client based on the provided prompt and configuration.
 
@@ -27,28 +36,68 @@ async def generate_with_openai_async(
         client: OpenAI client instance.
         formatted_prompt_dict (dict): Dictionary containing system and user messages.
         llm_input_args_config (dict): Configuration for LLM input arguments.
+        return_model (bool): Return an LLMResult instead of a dict.
+        offloader (BoundedOffloader, optional): Request the raw output text with
+            `responses.create` and validate it in a worker pool, instead of on
+            the event loop inside `responses.parse`.
+        task (str): Task name used in logs and progress.
+        limiter (RequestLimiter, optional): Shared limit on requests in flight
+            and tokens per minute, fed with the prompt's estimated tokens.
 
     Returns:
-        dict: Generated goals and metadata.
+        dict | LLMResult: Generated goals and metadata.
     """
     llm_input_args = prepare_llm_input_args(
         llm_input_args_config, formatted_prompt_dict
     )
+    if offloader:
+        llm_input_args = to_raw_llm_input_args(llm_input_args)
+        request = async_client.responses.create
+    else:
+        request = async_client.responses.parse
 
-    response = await async_client.responses.parse(**llm_input_args)
+    progress = get_progress()
+    # estimated input tokens plus the worst case output
+    request_tokens = formatted_prompt_dict.get(
+        "estimated_input_tokens", 0
+    ) + llm_input_args_config.get("max_output_tokens", 0)
+    # a request counts as in flight from dispatch until its output is parsed;
+    # failed validation and cancellation count as failed, not completed
+    dispatched = False
+    try:
+        async with limiter.limit(request_tokens) if limiter else nullcontext():
+            progress.start(task)
+            dispatched = True
+            start_time = perf_counter()
+            with stage("dispatch"):
+                response = await request(**llm_input_args)
+        with stage("logging"):
+            tokens = record_llm_call(
+                task, response, perf_counter() - start_time, formatted_prompt_dict
+            )
 
-    json_output = response.output_text
-    validated_output = (
-        llm_input_args_config["text_format"]
-        .model_validate_json(json_output)
-        .model_dump()
-    )
-    logger.info("LLM output validated successfully.")
-
-    # add metadata to the output
-    validated_output = add_metadata_to_llm_output(
-        validated_output, formatted_prompt_dict
-    )
+        if offloader:
+            # ship only the output text, the full response is not worth pickling
+            response_output = SimpleNamespace(output_text=response.output_text)
+            with stage("parse_offloaded"):
+                validated_output = await offloader.run(
+                    build_llm_output,
+                    response_output,
+                    formatted_prompt_dict,
+                    llm_input_args_config,
+                    return_model,
+                )
+        else:
+            with stage("parse"):
+                validated_output = build_llm_output(
+                    response, formatted_prompt_dict, llm_input_args_config, return_model
+                )
+    except BaseException:
+        if dispatched:
+            progress.fail(task)
+        raise
+    with stage("progress"):
+        progress.finish(task, tokens)
 
     return validated_output
 
@@ -58,11 +107,101 @@ async def batch_generate(
     async_client,
     formatted_prompt_dict_list: list[dict],
     llm_input_args_config: dict,
+    return_model: bool = False,
+    offloader=None,
+    task: str = "default",
+    limiter=None,
 ):
+    get_progress().add_total(task, len(formatted_prompt_dict_list))
     tasks = [
-        generate_with_openai_async(async_client, prompt_dict, llm_input_args_config)
+        generate_with_openai_async(
+            async_client,
+            prompt_dict,
+            llm_input_args_config,
+            return_model,
+            offloader,
+            task,
+            limiter,
+        )
         for prompt_dict in formatted_prompt_dict_list
     ]
 
     results = await asyncio.gather(*tasks)
     return results
+
+
+# batch processing yielding results as they complete, in priority order
+async def iter_generate(
+    async_client,
+    formatted_prompt_dict_list: list[dict],
+    llm_input_args_config: dict,
+    return_model: bool = False,
+    offloader=None,
+    task: str = "default",
+    limiter=None,
+    priorities: list | None = None,
+    max_in_flight: int | None = None,
+    return_exceptions: bool = False,
+):
+    """
+    Generate outputs for a batch of prompts and yield each one as soon as it
+    completes, instead of waiting for the whole batch like batch_generate.
+
+    Prompts are dispatched in priority order (lowest value first, ties in input
+    order) by at most `max_in_flight` workers, which defaults to the limiter's
+    concurrency. Priorities only matter with a bound, so when priorities are
+    given without one, "priority_max_in_flight" of LLM_RATE_LIMIT_CONFIG is
+    used; without priorities an unbounded run dispatches every prompt at once.
+
+    Args:
+        priorities (list, optional): Sort key of each prompt, e.g. from
+            utils.priority. Input order is used if not given.
+        max_in_flight (int, optional): Number of concurrent workers.
+        return_exceptions (bool): Yield failures as exceptions instead of raising.
+        Other arguments are the same as for batch_generate.
+
+    Yields:
+        tuple[int, dict | LLMResult | Exception]: Index of the prompt in
+            formatted_prompt_dict_list and its output.
+    """
+    num_prompts = len(formatted_prompt_dict_list)
+    get_progress().add_total(task, num_prompts)
+    dispatch_order = list(range(num_prompts))
+    if priorities is not None:
+        dispatch_order.sort(key=lambda i: priorities[i])
+    pending_indices = deque(dispatch_order)
+    completed = asyncio.Queue()
+
+    async def worker():
+        while pending_indices:
+            i = pending_indices.popleft()
+            try:
+                output = await generate_with_openai_async(
+                    async_client,
+                    formatted_prompt_dict_list[i],
+                    llm_input_args_config,
+                    return_model,
+                    offloader,
+                    task,
+                    limiter,
+                )
+            except Exception as e:  # noqa: BLE001
+                # failures are handed to the consumer, which raises or yields them
+                output = e
+            completed.put_nowait((i, output))
+
+    if max_in_flight is None and limiter:
+        max_in_flight = limiter.max_concurrency
+    if max_in_flight is None and priorities is not None:
+        max_in_flight = LLM_RATE_LIMIT_CONFIG["priority_max_in_flight"]
+    num_workers = min(max_in_flight or num_prompts, num_prompts)
+    workers = [asyncio.create_task(worker()) for _ in range(num_workers)]
+    try:
+        for _ in range(num_prompts):
+            i, output = await completed.get()
+            if isinstance(output, Exception) and not return_exceptions:
+                raise output
+            yield i, output
+    finally:
+        for worker_task in workers:
+            worker_task.cancel()
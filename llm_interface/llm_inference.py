@@ -1,12 +1,13 @@
 # This module provides functionality to generate goals using an OpenAI client.
 import logging
+from functools import cache
+from time import perf_counter
 
-# Configure basic logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+from openai.lib._parsing._responses import type_to_text_format_param
+from pydantic import BaseModel, TypeAdapter
+
+from utils.logging_config import get_call_logger
+from utils.profiling import stage
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -34,6 +35,8 @@ def prepare_llm_input_args(
     # Remove system_message and user_message from the final args since it's now in messages
     llm_input_args.pop("system_prompt", None)
     llm_input_args.pop("user_prompt", None)
+    # per-employee template of packed prompts
+    llm_input_args.pop("employee_prompt", None)
 
     return llm_input_args
 
@@ -52,9 +55,137 @@ def add_metadata_to_llm_output(llm_output: dict, prompt_dict: dict) -> dict:
     return llm_output
 
 
+class LLMResult:
+    """
+    Lightweight record holding a validated LLM output model with its metadata.
+    The model is only dumped to a dict on final serialization.
+    """
+
+    __slots__ = ("metadata", "missing_info", "output")
+
+    def __init__(self, output: BaseModel, metadata: dict, missing_info: list):
+        self.output = output
+        self.metadata = metadata
+        self.missing_info = missing_info
+
+    def to_dict(self) -> dict:
+        return {
+            **self.output.model_dump(),
+            "metadata": self.metadata,
+            "missing_info": self.missing_info,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"LLMResult(output={self.output!r}, metadata={self.metadata!r}, "
+            f"missing_info={self.missing_info!r})"
+        )
+
+
+@cache
+def get_type_adapter(text_format: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(text_format)
+
+
+@cache
+def get_text_format_param(text_format: type[BaseModel]) -> dict:
+    """
+    Get the `text.format` argument of `responses.create` for an output schema,
+    the same strict JSON schema `responses.parse` sends for `text_format`.
+    """
+    return type_to_text_format_param(text_format)
+
+
+def to_raw_llm_input_args(llm_input_args: dict) -> dict:
+    """
+    Turn `responses.parse` arguments into `responses.create` ones, so the
+    response comes back with the raw output text only and validation can run
+    elsewhere, e.g. in a worker pool.
+    Args:
+        llm_input_args (dict): Arguments from prepare_llm_input_args.
+    Returns:
+        dict: Arguments with `text_format` replaced by `text.format`.
+    """
+    raw_llm_input_args = llm_input_args.copy()
+    text_format = raw_llm_input_args.pop("text_format")
+    raw_llm_input_args["text"] = {
+        **raw_llm_input_args.get("text", {}),
+        "format": get_text_format_param(text_format),
+    }
+    return raw_llm_input_args
+
+
+def parse_llm_output(response, text_format: type[BaseModel]) -> BaseModel:
+    """
+    Get the structured output of a response, validating it at most once.
+
+    `responses.parse` already fills `output_parsed` with a validated model, so it
+    is reused as is. Otherwise the raw JSON is validated with a cached TypeAdapter.
+    Args:
+        response: Response returned by the OpenAI client.
+        text_format (type[BaseModel]): Expected output schema.
+    Returns:
+        BaseModel: Validated output model.
+    """
+    output_parsed = getattr(response, "output_parsed", None)
+    if isinstance(output_parsed, text_format):
+        return output_parsed
+    return get_type_adapter(text_format).validate_json(response.output_text)
+
+
+def build_llm_output(
+    response, prompt_dict: dict, llm_input_args_config: dict, return_model: bool
+) -> dict | LLMResult:
+    """
+    Turn a response into the output returned by the generate functions.
+    Args:
+        response: Response returned by the OpenAI client.
+        prompt_dict (dict): Dictionary containing metadata and missing information.
+        llm_input_args_config (dict): Configuration for LLM input arguments.
+        return_model (bool): Return an LLMResult instead of a dict.
+    Returns:
+        dict | LLMResult: Validated output with metadata and missing information.
+    """
+    validated_output = parse_llm_output(response, llm_input_args_config["text_format"])
+    if return_model:
+        return LLMResult(
+            validated_output,
+            prompt_dict.get("metadata", {}),
+            prompt_dict.get("missing_info", []),
+        )
+    return add_metadata_to_llm_output(validated_output.model_dump(), prompt_dict)
+
+
+def record_llm_call(task: str, response, latency: float, prompt_dict: dict) -> int:
+    """
+    Record latency and token usage of a call for sampled logs and throughput.
+    Args:
+        task (str): Task name, e.g. "generate_employee_goals".
+        response: Response returned by the OpenAI client.
+        latency (float): Call latency in seconds.
+        prompt_dict (dict): Dictionary containing metadata of the call.
+    Returns:
+        int: Total number of tokens used by the call.
+    """
+    usage = getattr(response, "usage", None)
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or 0
+    get_call_logger(task).record(
+        latency,
+        input_tokens,
+        output_tokens,
+        employee_id=prompt_dict.get("metadata", {}).get("employee_id"),
+    )
+    return input_tokens + output_tokens
+
+
 def generate_with_openai(
-    client, prompt_dict: dict, llm_input_args_config: dict
-) -> dict:
+    client,
+    prompt_dict: dict,
+    llm_input_args_config: dict,
+    return_model: bool = False,
+    task: str = "default",
+) -> dict | LLMResult:
     """
     Generate goals using OpenAI client based on the provided prompt and configuration.
 
@@ -62,22 +193,23 @@ def generate_with_openai(
         client: OpenAI client instance.
         prompt_dict (dict): Dictionary containing system and user messages.
         llm_input_args_config (dict): Configuration for LLM input arguments.
+        return_model (bool): Return an LLMResult instead of a dict.
+        task (str): Task name used in logs.
 
     Returns:
-        dict: Generated goals and metadata.
+        dict | LLMResult: Generated goals and metadata.
     """
     llm_input_args = prepare_llm_input_args(llm_input_args_config, prompt_dict)
 
-    response = client.responses.parse(**llm_input_args)
+    start_time = perf_counter()
+    with stage("dispatch"):
+        response = client.responses.parse(**llm_input_args)
+    with stage("logging"):
+        record_llm_call(task, response, perf_counter() - start_time, prompt_dict)
 
-    json_output = response.output_text
-    validated_output = (
-        llm_input_args_config["text_format"]
-        .model_validate_json(json_output)
-        .model_dump()
-    )
-    logger.info("LLM output validated successfully.")
-    # add metadata to the output
-    validated_output = add_metadata_to_llm_output(validated_output, prompt_dict)
+    with stage("parse"):
+        validated_output = build_llm_output(
+            response, prompt_dict, llm_input_args_config, return_model
+        )
 
     return validated_output
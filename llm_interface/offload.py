@@ -0,0 +1,60 @@
+# Offload CPU-bound work from the event loop to a bounded worker pool.
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedOffloader:
+    """
+    Run CPU-bound callables in a thread or process pool from async code.
+
+    At most `max_pending` calls are queued or running at once; further callers
+    wait on the event loop instead of piling work into the executor queue.
+    Callables and arguments must be picklable when using a process pool.
+    """
+
+    def __init__(
+        self,
+        executor_type: str = "process",
+        max_workers: int = 4,
+        max_pending: int = 256,
+    ):
+        if executor_type == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        elif executor_type == "process":
+            self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Unsupported executor type: {executor_type}")
+        self.executor_type = executor_type
+        self._semaphore = asyncio.Semaphore(max_pending)
+
+    async def run(self, fn, *args):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def make_offloader(offload_config: dict) -> BoundedOffloader | None:
+    """
+    Create an offloader from config, or None if offloading is disabled.
+    Args:
+        offload_config (dict): Offload settings, see LLM_OFFLOAD_CONFIG.
+    Returns:
+        BoundedOffloader | None: Offloader instance.
+    """
+    if not offload_config["enabled"]:
+        return None
+    logger.info(
+        f"Offloading response validation to a {offload_config['executor_type']} pool "
+        f"with {offload_config['max_workers']} workers."
+    )
+    return BoundedOffloader(
+        executor_type=offload_config["executor_type"],
+        max_workers=offload_config["max_workers"],
+        max_pending=offload_config["max_pending"],
+    )
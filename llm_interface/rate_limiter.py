@@ -0,0 +1,78 @@
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+
+
+class RequestLimiter:
+    """
+    Limit LLM requests across a whole batch run.
+
+    One limiter is shared by every batch_generate call of a run, so nested
+    batches (e.g. one per employee) are bounded together. It caps the number
+    of requests in flight and, with a token bucket refilled continuously at
+    `tokens_per_minute`, the estimated tokens dispatched per minute. A limit
+    of None means unbounded.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        tokens_per_minute: int | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+        self._available_tokens = tokens_per_minute or 0
+        self._last_refill = monotonic()
+        # waiters reserve tokens one at a time, in arrival order
+        self._token_lock = asyncio.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self._available_tokens = min(
+            self.tokens_per_minute,
+            self._available_tokens
+            + (now - self._last_refill) * self.tokens_per_minute / 60,
+        )
+        self._last_refill = now
+
+    async def _reserve_tokens(self, tokens: int):
+        if not self.tokens_per_minute:
+            return
+        # a single request larger than the quota only waits for a full bucket
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._token_lock:
+            self._refill()
+            while self._available_tokens < tokens:
+                missing_tokens = tokens - self._available_tokens
+                await asyncio.sleep(missing_tokens * 60 / self.tokens_per_minute)
+                self._refill()
+            self._available_tokens -= tokens
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0):
+        """
+        Wait for `tokens` of TPM budget and a free concurrency slot.
+
+        Usage:
+            async with limiter.limit(estimated_tokens):
+                response = await async_client.responses.parse(...)
+        """
+        await self._reserve_tokens(tokens)
+        if self._semaphore:
+            async with self._semaphore:
+                yield
+        else:
+            yield
+
+
+def make_request_limiter(rate_limit_config: dict) -> RequestLimiter:
+    """
+    Create a request limiter from config, see LLM_RATE_LIMIT_CONFIG.
+    """
+    return RequestLimiter(
+        max_concurrency=rate_limit_config["max_concurrency"],
+        tokens_per_minute=rate_limit_config["tokens_per_minute"],
+    )
@@ -1,15 +1,38 @@
+import argparse
+import asyncio
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import pandas as pd
 
+from llm_interface.rate_limiter import make_request_limiter
 from scripts.generate_company_data import (
+    JsonLinesWriter,
     generate_employee_data,
+    submit_write,
     write_to_csv,
     write_to_json,
 )
-from task_configs.config import LLM_TASKS_CONFIG
-from task_endpoints.generate_employee_goals import generate_batch_employee_goals
-from task_endpoints.llm_judge_evaluate_goal import process_all_employee_goals
+from task_configs.config import (
+    LLM_OFFLOAD_CONFIG,
+    LLM_RATE_LIMIT_CONFIG,
+    LLM_TASKS_CONFIG,
+    PROGRESS_CONFIG,
+)
+from task_endpoints.generate_employee_goals import (
+    generate_batch_employee_goals,
+    generate_packed_batch_employee_goals,
+    iter_batch_employee_goals,
+)
+from task_endpoints.llm_judge_evaluate_goal import (
+    goal_cache,
+    process_all_employee_goals,
+    process_single_employee_goals,
+)
+from utils.data_prep import load_employee_data
+from utils.logging_config import configure_logging
+from utils.profiling import add_profile_arguments, profiling_session, stage
+from utils.progress import ProgressReporter, get_progress, serve_metrics
 
 # NUMBER OF EMPLOYEES
 NUM_EMPLOYEES = 50
@@ -23,50 +46,169 @@ if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 # File path for the generated data
 FILE_NAME = f"synthetic_employee_data_{NUM_EMPLOYEES}_{PROVIDER}_{MODEL}"
+# Write and evaluate each employee's goals as soon as they are generated,
+# instead of stage by stage. Output records are in completion order.
+STREAM_RESULTS = False
+# Priority key from utils.priority for streaming runs, e.g. shortest_prompt_first
+PRIORITY_KEY = None
+# Generate goals for several employees per request, see "packing_factor" of
+# generate_employee_goals_packed in LLM_TASKS_CONFIG
+PACKED_GENERATION = False
+
+
+def run_with_progress(employee_data_file: str | None = None):
+    """
+    Run main() while showing live progress and optionally serving /metrics.
+    """
+    progress = get_progress()
+    reporter = ProgressReporter(progress) if PROGRESS_CONFIG["enabled"] else None
+    metrics_server = (
+        serve_metrics(progress, PROGRESS_CONFIG["metrics_port"])
+        if PROGRESS_CONFIG["metrics_port"]
+        else None
+    )
+    if reporter:
+        reporter.start()
+    try:
+        main(employee_data_file)
+    finally:
+        if reporter:
+            reporter.stop()
+        if metrics_server:
+            metrics_server.shutdown()
+
+
+def get_output_file_name(employee_data_file: str | None = None) -> str:
+    """
+    Base name of the output files: the name of the input employee data file,
+    or FILE_NAME for generated data.
+    """
+    if employee_data_file:
+        return os.path.splitext(os.path.basename(employee_data_file))[0]
+    return FILE_NAME
+
+
+async def stream_goals_and_evaluations(employee_dict_list: list[dict], file_name: str):
+    """
+    Generate goals in priority order and hand each employee to the judge and
+    the writers the moment its goals land.
+    """
+    goals_config = LLM_TASKS_CONFIG["generate_employee_goals"]["openai"][
+        "llm_input_args"
+    ]
+    judge_config = LLM_TASKS_CONFIG["llm_judge_evaluate_goal"]["openai"][
+        "llm_input_args"
+    ]
+    limiter = make_request_limiter(LLM_RATE_LIMIT_CONFIG)
+    get_progress().concurrency_limit = limiter.max_concurrency
+    evaluations = []
+
+    with (
+        JsonLinesWriter(OUTPUT_DIR, file_name + "_with_goals") as goals_writer,
+        JsonLinesWriter(
+            OUTPUT_DIR, file_name + "_with_evaluated_goals"
+        ) as evaluated_writer,
+    ):
+
+        async def evaluate(employee_data):
+            employee_data["evaluated_goals"] = await process_single_employee_goals(
+                employee_data, judge_config, limiter=limiter
+            )
+            evaluated_writer.write(employee_data)
 
+        async for index, result in iter_batch_employee_goals(
+            employee_dict_list, goals_config, PRIORITY_KEY, limiter, return_model=True
+        ):
+            employee_data = {**employee_dict_list[index], "goals": result.output.goals}
+            goals_writer.write(employee_data)
+            evaluations.append(asyncio.create_task(evaluate(employee_data)))
+        await asyncio.gather(*evaluations)
 
-def main():
-    # generate company data
-    df_employee = generate_employee_data()
-    # save to CSV
-    write_to_csv(df_employee, OUTPUT_DIR, FILE_NAME)
-    # read the employee data from saved CSV
-    df_employee = pd.read_csv(OUTPUT_DIR + "/" + FILE_NAME + ".csv")
+
+def main(employee_data_file: str | None = None):
+    configure_logging()
+    file_name = get_output_file_name(employee_data_file)
+    with stage("load"):
+        if employee_data_file:
+            # e.g. a large roster from scripts/generate_scale_data.py
+            df_employee = load_employee_data(employee_data_file)
+        else:
+            # generate company data
+            df_employee = generate_employee_data()
+            # save to CSV
+            write_to_csv(df_employee, OUTPUT_DIR, file_name)
+            # read the employee data from saved CSV
+            df_employee = pd.read_csv(OUTPUT_DIR + "/" + file_name + ".csv")
     print(f"Loaded {len(df_employee)} employee records from CSV.")
     # print the first few records
     print(df_employee.head())
-    # generale employee goals all at once
-    all_employee_goals = generate_batch_employee_goals(
-        df_employee,
-        LLM_TASKS_CONFIG["generate_employee_goals"]["openai"]["llm_input_args"],
-    )
+    if STREAM_RESULTS:
+        with stage("pandas"):
+            employee_dict_list = df_employee.to_dict(orient="records")
+        asyncio.run(stream_goals_and_evaluations(employee_dict_list, file_name))
+        if goal_cache:
+            goal_cache.flush()
+        return
+    # generale employee goals all at once, kept as LLMResult records
+    if PACKED_GENERATION:
+        all_employee_goals = generate_packed_batch_employee_goals(
+            df_employee, return_model=True
+        )
+    else:
+        all_employee_goals = generate_batch_employee_goals(
+            df_employee,
+            LLM_TASKS_CONFIG["generate_employee_goals"]["openai"]["llm_input_args"],
+            return_model=True,
+        )
     # print the first few generated goals
     print(f"Generated Goals for Employees: {len(all_employee_goals)}")
     print(all_employee_goals[:5])  # Print first 5 goals for brevity
     # add the generated goals to the DataFrame
     # parse just goals from generate_batch_employee_goals
-    goals_list = [
-        single_employee_goals["goals"] for single_employee_goals in all_employee_goals
-    ]
-    df_employee["goals"] = goals_list
+    with stage("pandas"):
+        goals_list = [
+            single_employee_goals.output.goals
+            for single_employee_goals in all_employee_goals
+        ]
+        df_employee["goals"] = goals_list
     print("First 5 employee goals:")
     print(df_employee.head())
     # save the updated DataFrame with goals to json
-    write_to_json(df_employee, OUTPUT_DIR, FILE_NAME + "_with_goals")
-    print(
-        f"\nGenerated {len(df_employee)} employee records with goals and saved to {OUTPUT_DIR}/{FILE_NAME}_with_goals.json"
-    )
+    if LLM_OFFLOAD_CONFIG["enabled"]:
+        # write in the background while the goals are evaluated
+        executor_cls = (
+            ProcessPoolExecutor
+            if LLM_OFFLOAD_CONFIG["executor_type"] == "process"
+            else ThreadPoolExecutor
+        )
+        write_executor = executor_cls(max_workers=1)
+        with stage("write"):
+            goals_write = submit_write(
+                write_executor,
+                write_to_json,
+                df_employee,
+                OUTPUT_DIR,
+                file_name + "_with_goals",
+            )
+    else:
+        write_executor = None
+        with stage("write"):
+            write_to_json(df_employee, OUTPUT_DIR, file_name + "_with_goals")
+        print(
+            f"\nGenerated {len(df_employee)} employee records with goals and saved to {OUTPUT_DIR}/{file_name}_with_goals.json"
+        )
     # llm judge evaluate goals
 
-    all_evaluated_goals = process_all_employee_goals(
-        df_employee.to_dict(orient="records")
-    )
+    with stage("pandas"):
+        employee_dict_list = df_employee.to_dict(orient="records")
+    all_evaluated_goals = process_all_employee_goals(employee_dict_list)
     # print the first few evaluated goals
     print("Evaluated Goals for Employees:")
     print(all_evaluated_goals[:1])  # Print first 5 evaluations for brevity
     # add the evaluated goals to the DataFrame
 
-    df_employee["evaluated_goals"] = all_evaluated_goals
+    with stage("pandas"):
+        df_employee["evaluated_goals"] = all_evaluated_goals
 
     print("\nFirst employee's details with evaluated goals from DataFrame:")
     # Print relevant columns for the first employee to check
@@ -74,8 +216,22 @@ def main():
     print(df_employee.head(1).to_string())
 
     # save the updated DataFrame with evaluated goals to json
-    output_filename_evaluated = FILE_NAME + "_with_evaluated_goals"
-    write_to_json(df_employee, OUTPUT_DIR, output_filename_evaluated)
+    output_filename_evaluated = file_name + "_with_evaluated_goals"
+    with stage("write"):
+        if write_executor:
+            evaluated_write = submit_write(
+                write_executor,
+                write_to_json,
+                df_employee,
+                OUTPUT_DIR,
+                output_filename_evaluated,
+            )
+            # wait for both background writes to finish
+            goals_write.result()
+            evaluated_write.result()
+            write_executor.shutdown()
+        else:
+            write_to_json(df_employee, OUTPUT_DIR, output_filename_evaluated)
     print(
         f"\nUpdated DataFrame with evaluated goals and saved to "
         f"{OUTPUT_DIR}/{output_filename_evaluated}.json"
@@ -83,4 +239,15 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Generate and evaluate employee goals."
+    )
+    parser.add_argument(
+        "--input",
+        help="Employee data CSV to use instead of generating synthetic data; "
+        "output files are named after it.",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    with profiling_session(args.profile, args.profiler, OUTPUT_DIR):
+        run_with_progress(args.input)
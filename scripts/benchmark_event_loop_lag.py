@@ -0,0 +1,80 @@
+# Measure event loop lag of batch_generate with and without offloaded validation
+import asyncio
+import random
+from time import perf_counter
+from types import SimpleNamespace
+
+from llm_interface.async_llm_inference import batch_generate
+from llm_interface.offload import BoundedOffloader
+from task_configs.config import LLM_TASKS_CONFIG
+from task_configs.schemas import EmployeeGoals
+from utils.loop_lag import EventLoopLagMonitor
+
+NUM_REQUESTS = 20_000
+MEAN_LATENCY = 0.2  # seconds, simulated network latency per request
+
+OUTPUT_TEXT = EmployeeGoals.model_validate(
+    {
+        "goals": [
+            "Reduce P1 incident response time by 20% by the end of Q3. " * 8,
+            "Increase unit test coverage of the billing service to 80%. " * 8,
+            "Mentor two junior engineers through their first on-call rotation. " * 8,
+            "Ship the new onboarding flow to 100% of users by September. " * 8,
+            "Cut p95 latency of the search API below 300ms. " * 8,
+        ]
+    }
+).model_dump_json()
+
+
+class SimulatedResponses:
+    async def parse(self, text_format, **llm_input_args):
+        await asyncio.sleep(random.expovariate(1 / MEAN_LATENCY))
+        # like the SDK, responses.parse validates the output on the event loop
+        output_parsed = text_format.model_validate_json(OUTPUT_TEXT)
+        return SimpleNamespace(output_text=OUTPUT_TEXT, output_parsed=output_parsed)
+
+    async def create(self, **llm_input_args):
+        await asyncio.sleep(random.expovariate(1 / MEAN_LATENCY))
+        # the offload path gets the raw text and validates it in the pool
+        return SimpleNamespace(output_text=OUTPUT_TEXT)
+
+
+class SimulatedAsyncClient:
+    def __init__(self):
+        self.responses = SimulatedResponses()
+
+
+async def run(llm_input_args_config: dict, prompt_dicts: list, offloader) -> dict:
+    start_time = perf_counter()
+    async with EventLoopLagMonitor() as lag_monitor:
+        await batch_generate(
+            SimulatedAsyncClient(),
+            prompt_dicts,
+            llm_input_args_config,
+            offloader=offloader,
+        )
+    return {"wall_s": round(perf_counter() - start_time, 2), **lag_monitor.summary()}
+
+
+def main():
+    llm_input_args_config = {
+        **LLM_TASKS_CONFIG["generate_employee_goals"]["openai"]["llm_input_args"],
+        "text_format": EmployeeGoals,
+    }
+    prompt_dicts = [
+        {"system_prompt": "", "user_prompt": "", "metadata": {}, "missing_info": []}
+        for _ in range(NUM_REQUESTS)
+    ]
+    print(f"{NUM_REQUESTS} simulated requests, mean latency {MEAN_LATENCY}s")
+    for executor_type in [None, "thread", "process"]:
+        offloader = BoundedOffloader(executor_type) if executor_type else None
+        try:
+            result = asyncio.run(run(llm_input_args_config, prompt_dicts, offloader))
+        finally:
+            if offloader:
+                offloader.shutdown()
+        print(f"  offload={executor_type or 'off':<8} {result}")
+
+
+if __name__ == "__main__":
+    main()
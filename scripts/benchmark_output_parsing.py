@@ -0,0 +1,95 @@
+# Benchmark the per-response CPU cost of turning LLM responses into outputs
+import json
+from time import perf_counter
+from types import SimpleNamespace
+
+from llm_interface.llm_inference import (
+    add_metadata_to_llm_output,
+    build_llm_output,
+)
+from task_configs.schemas import EmployeeGoals, GoalEvaluation
+
+NUM_RESPONSES = 100_000
+
+SAMPLE_OUTPUTS = {
+    EmployeeGoals: {
+        "goals": [
+            "Reduce P1 incident response time by 20% by the end of Q3.",
+            "Increase unit test coverage of the billing service from 60% to 80%.",
+            "Mentor two junior engineers through their first on-call rotation.",
+            "Ship the new onboarding flow to 100% of users by September.",
+        ]
+    },
+    GoalEvaluation: {
+        "clarity": {"score": "High", "reason": "The goal is easy to understand."},
+        "specificity": {"score": "High", "reason": "It names a concrete target."},
+        "role_fit": {"score": "Yes", "reason": "Fits a senior engineer."},
+        "measurability": {"score": "Yes", "reason": "Progress is tracked in %."},
+    },
+}
+
+PROMPT_DICT = {
+    "metadata": {"employee_name": "Ava Liu", "job_title": "Software Engineer"},
+    "missing_info": [],
+}
+
+
+def make_responses(text_format, with_output_parsed: bool) -> list:
+    output_text = json.dumps(SAMPLE_OUTPUTS[text_format])
+    output_parsed = text_format.model_validate_json(output_text)
+    return [
+        SimpleNamespace(
+            output_text=output_text,
+            output_parsed=output_parsed if with_output_parsed else None,
+        )
+        for _ in range(NUM_RESPONSES)
+    ]
+
+
+def legacy_parse(response, text_format):
+    # previous behaviour: validate output_text again and dump to a dict
+    validated_output = text_format.model_validate_json(
+        response.output_text
+    ).model_dump()
+    return add_metadata_to_llm_output(validated_output, PROMPT_DICT)
+
+
+def time_per_response(fn, responses) -> float:
+    start_time = perf_counter()
+    for response in responses:
+        fn(response)
+    return (perf_counter() - start_time) / len(responses) * 1e6
+
+
+def main():
+    for text_format in SAMPLE_OUTPUTS:
+        config = {"text_format": text_format}
+        parsed_responses = make_responses(text_format, with_output_parsed=True)
+        raw_responses = make_responses(text_format, with_output_parsed=False)
+        results = {
+            "legacy (validate + dump)": time_per_response(
+                lambda r, text_format=text_format: legacy_parse(r, text_format),
+                parsed_responses,
+            ),
+            "fast path, dict output": time_per_response(
+                lambda r, config=config: build_llm_output(
+                    r, PROMPT_DICT, config, False
+                ),
+                parsed_responses,
+            ),
+            "fast path, model output": time_per_response(
+                lambda r, config=config: build_llm_output(r, PROMPT_DICT, config, True),
+                parsed_responses,
+            ),
+            "TypeAdapter fallback, model output": time_per_response(
+                lambda r, config=config: build_llm_output(r, PROMPT_DICT, config, True),
+                raw_responses,
+            ),
+        }
+        print(f"\n{text_format.__name__} ({NUM_RESPONSES} responses)")
+        for name, micros in results.items():
+            print(f"  {name:<36} {micros:8.2f} us/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Benchmark packed goal generation: request count, tokens and latency per packing factor
+import asyncio
+import json
+import os
+import random
+from time import perf_counter
+from types import SimpleNamespace
+
+from llm_interface.async_llm_inference import batch_generate
+from llm_interface.rate_limiter import RequestLimiter
+from scripts.generate_scale_data import generate_employee_data_fast
+from task_configs.config import LLM_TASKS_CONFIG
+from task_configs.prompt_prep import estimate_tokens, format_goal_generation_prompt
+
+# the endpoint module creates OpenAI clients on import; no request is sent with them
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_ORG_ID", "benchmark")
+from task_endpoints.generate_employee_goals import (
+    generate_packed_employee_goals_async,
+)
+
+NUM_EMPLOYEES = 2_000
+PACKING_FACTORS = [1, 5, 10, 20]
+MAX_CONCURRENCY = 50
+# simulated latency: fixed overhead plus generation time per output token
+BASE_LATENCY = 0.4  # seconds
+LATENCY_PER_OUTPUT_TOKEN = 0.005  # seconds
+OUTPUT_TOKENS_PER_EMPLOYEE = 90
+# share of employees in a packed response with too few goals
+INVALID_ENTRY_RATE = 0.02
+# scale simulated latency down so the benchmark runs quickly
+TIME_SCALE = 0.05
+
+GOALS = [
+    "Reduce P1 incident response time by 20% by the end of Q3.",
+    "Increase unit test coverage of the billing service to 80%.",
+    "Mentor two junior engineers through their first on-call rotation.",
+    "Ship the new onboarding flow to 100% of users by September.",
+]
+
+
+class SimulatedResponses:
+    def __init__(self):
+        self.requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    async def parse(self, **llm_input_args):
+        input_tokens = sum(
+            estimate_tokens(message["content"]) for message in llm_input_args["input"]
+        )
+        text_format = llm_input_args["text_format"]
+        if text_format.__name__ == "PackedEmployeeGoals":
+            employee_keys = [
+                line.split(": ")[1]
+                for line in llm_input_args["input"][1]["content"].splitlines()
+                if line.startswith("Employee key: ")
+            ]
+            output = {
+                "employees": [
+                    {
+                        "employee_key": employee_key,
+                        "goals": GOALS[:2]
+                        if random.random() < INVALID_ENTRY_RATE
+                        else GOALS,
+                    }
+                    for employee_key in employee_keys
+                ]
+            }
+        else:
+            employee_keys = [None]
+            output = {"goals": GOALS}
+        output_tokens = OUTPUT_TOKENS_PER_EMPLOYEE * len(employee_keys)
+
+        self.requests += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        await asyncio.sleep(
+            (BASE_LATENCY + LATENCY_PER_OUTPUT_TOKEN * output_tokens) * TIME_SCALE
+        )
+        return SimpleNamespace(
+            output_text=json.dumps(output),
+            output_parsed=None,
+            usage=SimpleNamespace(
+                input_tokens=input_tokens, output_tokens=output_tokens
+            ),
+        )
+
+
+async def run(employee_dict_list: list[dict], packing_factor: int | None) -> dict:
+    """
+    Generate goals with packing_factor employees per request, or with the
+    per-employee generate_employee_goals task if packing_factor is None.
+    """
+    responses = SimulatedResponses()
+    async_client = SimpleNamespace(responses=responses)
+    limiter = RequestLimiter(max_concurrency=MAX_CONCURRENCY)
+    start_time = perf_counter()
+    if packing_factor is None:
+        single_config = LLM_TASKS_CONFIG["generate_employee_goals"]["openai"][
+            "llm_input_args"
+        ]
+        await batch_generate(
+            async_client,
+            [
+                format_goal_generation_prompt(employee_data, single_config)
+                for employee_data in employee_dict_list
+            ],
+            single_config,
+            return_model=True,
+            task="generate_employee_goals",
+            limiter=limiter,
+        )
+        fallback_requests = 0
+    else:
+        _, packing_stats = await generate_packed_employee_goals_async(
+            async_client, employee_dict_list, packing_factor, limiter=limiter
+        )
+        fallback_requests = packing_stats["fallback_requests"]
+    return {
+        "requests": responses.requests,
+        "fallback_requests": fallback_requests,
+        "input_tokens": responses.input_tokens,
+        "output_tokens": responses.output_tokens,
+        # undo the time scaling to report simulated seconds
+        "simulated_wall_s": round((perf_counter() - start_time) / TIME_SCALE, 1),
+    }
+
+
+def main():
+    random.seed(0)
+    employee_dict_list = generate_employee_data_fast(NUM_EMPLOYEES, seed=0).to_dict(
+        orient="records"
+    )
+    print(
+        f"{NUM_EMPLOYEES} employees, max concurrency {MAX_CONCURRENCY}, "
+        f"{INVALID_ENTRY_RATE:.0%} invalid entries in packed responses"
+    )
+    result = asyncio.run(run(employee_dict_list, None))
+    print(f"  {'per-employee':<18} {result}")
+    for packing_factor in PACKING_FACTORS:
+        result = asyncio.run(run(employee_dict_list, packing_factor))
+        print(f"  {f'packing_factor={packing_factor}':<18} {result}")
+
+
+if __name__ == "__main__":
+    main()
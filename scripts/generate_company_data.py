@@ -1,9 +1,12 @@
 # Define the mock data schema for a synthetic company
+import json
+import math
 import os
 import uuid
 
 from dotenv import load_dotenv
 from mostlyai import mock
+from pydantic import BaseModel
 
 # load environment variables
 load_dotenv(override=True)
@@ -99,6 +102,28 @@ def write_to_csv(df, output_dir, file_name):
     print(f"Data saved to {file_path}")
 
 
+def to_jsonable(value):
+    """
+    Fallback of the JSON writers for values json cannot encode. LLM outputs are
+    kept as pydantic models until they are written, so models are dumped here.
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def dump_models(value):
+    """
+    Replace pydantic models in a cell, also inside lists such as the evaluated
+    goals of an employee, with their JSON-compatible dumps.
+    """
+    if isinstance(value, BaseModel):
+        return to_jsonable(value)
+    if isinstance(value, list):
+        return [dump_models(item) for item in value]
+    return value
+
+
 def write_to_json(df, output_dir, file_name):
     """
     Write the DataFrame to a JSON file.
@@ -109,10 +134,79 @@ def write_to_json(df, output_dir, file_name):
         file_name (str): The name of the file (without extension).
     """
     file_path = os.path.join(output_dir, file_name + ".json")
-    df.to_json(file_path, orient="records", lines=True)
+    df.to_json(file_path, orient="records", lines=True, default_handler=to_jsonable)
     print(f"Data saved to {file_path}")
 
 
+def write_to_parquet(df, output_dir, file_name):
+    """
+    Write the DataFrame to a Parquet file (requires pyarrow).
+
+    Args:
+        df (DataFrame): The DataFrame to write.
+        output_dir (str): The directory where the Parquet file will be saved.
+        file_name (str): The name of the file (without extension).
+    """
+    file_path = os.path.join(output_dir, file_name + ".parquet")
+    # pyarrow cannot convert pydantic models, dump them like the JSON writers do
+    df = df.apply(
+        lambda column: column.map(dump_models) if column.dtype == object else column
+    )
+    df.to_parquet(file_path, index=False)
+    print(f"Data saved to {file_path}")
+
+
+class JsonLinesWriter:
+    """
+    Append records to a JSON lines file as they are produced, so partial runs
+    already have their results on disk. Uses the same format as write_to_json.
+
+    Usage:
+        with JsonLinesWriter(OUTPUT_DIR, FILE_NAME) as writer:
+            writer.write(record)
+    """
+
+    def __init__(self, output_dir, file_name):
+        self.file_path = os.path.join(output_dir, file_name + ".json")
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.file_path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        print(f"Data saved to {self.file_path}")
+
+    def write(self, record: dict):
+        # missing values from pandas are NaN, written as null like to_json does
+        record = {
+            key: None if isinstance(value, float) and math.isnan(value) else value
+            for key, value in record.items()
+        }
+        self._file.write(json.dumps(record, default=to_jsonable) + "\n")
+        self._file.flush()
+
+
+def submit_write(executor, write_fn, df, output_dir, file_name):
+    """
+    Run a writer such as write_to_json in a worker pool so serialization does not
+    block the caller. A copy of the DataFrame is written, so the caller can keep
+    modifying its own.
+
+    Args:
+        executor (Executor): Thread or process pool to run the writer in.
+        write_fn (callable): Writer function, e.g. write_to_json or write_to_parquet.
+        df (DataFrame): The DataFrame to write.
+        output_dir (str): The directory where the file will be saved.
+        file_name (str): The name of the file (without extension).
+
+    Returns:
+        Future: Completes once the file is written.
+    """
+    return executor.submit(write_fn, df.copy(), output_dir, file_name)
+
+
 def main():
     """
     Main function to generate synthetic employee data and save it to a CSV file.
@@ -0,0 +1,333 @@
+# Fast, seeded synthetic employee rosters for scale testing, without an LLM
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Output directory
+OUTPUT_DIR = "output_data"
+
+COLUMNS = [
+    "employee_id",
+    "name",
+    "job_title",
+    "seniority_level",
+    "team_function",
+    "manager_org_priorities",
+]
+CONTEXT_COLUMNS = [
+    "job_title",
+    "seniority_level",
+    "team_function",
+    "manager_org_priorities",
+]
+
+# Vocabularies and distributions the roster is sampled from
+DEFAULT_DATA_SPEC = {
+    # word lists kept as strings for readability
+    "first_names": (  # noqa: SIM905
+        "Ava Liam Noah Emma Mia Ethan Zoe Lucas Aisha Mateo Yuki Priya Omar "
+        "Elif Chen Sofia Kwame Hana Diego Ingrid Ravi Nora Jonas Leila Tariq "
+        "Amara Felix Lina Kenji Zara Marco Anya Samir Freya Tomas Imani Arjun "
+        "Clara Dmitri Nadia"
+    ).split(),
+    "last_names": (  # noqa: SIM905
+        "Liu Smith Garcia Patel Kim Nguyen Okafor Muller Rossi Tanaka Cohen "
+        "Silva Yilmaz Haddad Novak Johansson Mensah Kowalski Fernandez Singh "
+        "Dubois Park Costa Ivanova Adeyemi Larsen Moreau Sato Khan Reyes"
+    ).split(),
+    # middle initials, so names rarely repeat even in large rosters
+    "middle_initials": list("ABCDEFGHIJKLMNOPRSTVW"),
+    "seniority_levels": {
+        "Junior": 0.2,
+        "Mid": 0.3,
+        "Senior": 0.25,
+        "Lead": 0.12,
+        "Director": 0.08,
+        "VP": 0.05,
+    },
+    "teams": {
+        "Engineering": {
+            "weight": 0.4,
+            "job_titles": [
+                "Software Engineer",
+                "Backend Engineer",
+                "Frontend Engineer",
+                "Site Reliability Engineer",
+                "Engineering Manager",
+                "Data Engineer",
+            ],
+            "priorities": [
+                "Reduce P1 incident response time by {percent}% by the end of {quarter}.",
+                "Raise test coverage of core services by {percent}% in {quarter}.",
+                "Migrate {percent}% of legacy services to the new platform by {quarter}.",
+                "Cut p95 API latency by {percent}% before {quarter}.",
+                "Raise deployment frequency by {percent}% without more rollbacks in {quarter}.",
+                "Have {percent}% of junior engineers lead an on-call shift by {quarter}.",
+            ],
+        },
+        "Product": {
+            "weight": 0.15,
+            "job_titles": ["Product Manager", "Product Owner", "Product Analyst"],
+            "priorities": [
+                "Launch the new onboarding flow to {percent}% of users by {quarter}.",
+                "Increase weekly active users by {percent}% in {quarter}.",
+                "Reduce churn in the SMB segment by {percent}% by {quarter}.",
+                "Align {percent}% of the roadmap with enterprise customer needs by {quarter}.",
+            ],
+        },
+        "Design": {
+            "weight": 0.1,
+            "job_titles": ["Product Designer", "UX Researcher", "Design Lead"],
+            "priorities": [
+                "Roll out the new design system to {percent}% of screens by {quarter}.",
+                "Improve accessibility scores across the app by {percent}% in {quarter}.",
+                "Run usability studies before {percent}% of launches in {quarter}.",
+            ],
+        },
+        "GTM": {
+            "weight": 0.2,
+            "job_titles": [
+                "Account Executive",
+                "Sales Manager",
+                "Marketing Manager",
+                "Customer Success Manager",
+            ],
+            "priorities": [
+                "Grow enterprise pipeline by {percent}% in {quarter}.",
+                "Improve net revenue retention by {percent}% by {quarter}.",
+                "Shorten the sales cycle by {percent}% by the end of {quarter}.",
+                "Reach {percent}% of target accounts in the EMEA market by {quarter}.",
+            ],
+        },
+        "Ops": {
+            "weight": 0.15,
+            "job_titles": [
+                "Operations Manager",
+                "People Partner",
+                "Finance Analyst",
+                "IT Specialist",
+            ],
+            "priorities": [
+                "Automate {percent}% of the month-end close by {quarter}.",
+                "Reduce time to hire by {percent}% in {quarter}.",
+                "Cut vendor management costs by {percent}% by {quarter}.",
+                "Improve employee engagement scores by {percent}% by {quarter}.",
+            ],
+        },
+    },
+    # share of rows where each field is missing
+    "missing_rates": {
+        "job_title": 0.02,
+        "seniority_level": 0.05,
+        "team_function": 0.02,
+        "manager_org_priorities": 0.1,
+    },
+    # share of rows copying the full job context of another row; other rows
+    # get numeric targets and quarters, so their contexts are almost all unique
+    "duplicate_context_rate": 0.3,
+    # min and max number of distinct sentences in manager_org_priorities
+    "priorities_sentences": (1, 3),
+    # values filled into the {percent} and {quarter} of priority templates
+    "target_percent_range": (5, 95),
+    "quarters": [
+        f"Q{quarter} {year}" for year in (2026, 2027) for quarter in range(1, 5)
+    ],
+}
+
+
+def _sample_weighted(rng, weights: dict, size: int) -> np.ndarray:
+    values = np.array(list(weights), dtype=object)
+    probabilities = np.array(list(weights.values()), dtype=float)
+    return rng.choice(values, size=size, p=probabilities / probabilities.sum())
+
+
+# fill priority templates elementwise over arrays of templates and targets
+_fill_priority = np.frompyfunc(
+    lambda template, percent, quarter: template.format(
+        percent=percent, quarter=quarter
+    ),
+    3,
+    1,
+)
+
+
+def generate_employee_data_fast(
+    num_employees: int, seed: int | list[int] = 0, data_spec: dict = DEFAULT_DATA_SPEC
+) -> pd.DataFrame:
+    """
+    Generate a synthetic employee roster with vectorized numpy sampling.
+
+    Args:
+        num_employees (int): Number of rows to generate.
+        seed (int | list[int]): Random seed, the same seed gives the same roster.
+        data_spec (dict): Vocabularies, distributions, missing-field rates,
+            duplicate-context rate and text lengths, see DEFAULT_DATA_SPEC.
+            Rows with a missing field are not made unique, so with missing
+            fields the share of duplicate contexts is above the set rate.
+
+    Returns:
+        DataFrame: Employee data with the same columns as generate_employee_data.
+    """
+    rng = np.random.default_rng(seed)
+    n = num_employees
+
+    first_names = rng.choice(np.array(data_spec["first_names"], dtype=object), n)
+    middle_initials = rng.choice(
+        np.array(data_spec["middle_initials"], dtype=object), n
+    )
+    last_names = rng.choice(np.array(data_spec["last_names"], dtype=object), n)
+    names = first_names + " " + middle_initials + ". " + last_names
+
+    seniority_levels = _sample_weighted(rng, data_spec["seniority_levels"], n)
+    teams = data_spec["teams"]
+    team_functions = _sample_weighted(
+        rng, {team: spec["weight"] for team, spec in teams.items()}, n
+    )
+
+    job_titles = np.empty(n, dtype=object)
+    priorities = np.empty(n, dtype=object)
+    min_sentences, max_sentences = data_spec["priorities_sentences"]
+    num_sentences = rng.integers(min_sentences, max_sentences + 1, n)
+    min_percent, max_percent = data_spec["target_percent_range"]
+    quarters = np.array(data_spec["quarters"], dtype=object)
+    for team, spec in teams.items():
+        mask = team_functions == team
+        count = int(mask.sum())
+        if not count:
+            continue
+        job_titles[mask] = rng.choice(np.array(spec["job_titles"], dtype=object), count)
+        templates = np.array(spec["priorities"], dtype=object)
+        # distinct sentences per row: the first columns of a random permutation
+        picks = rng.random((count, len(templates))).argsort(axis=1)[:, :max_sentences]
+        sentences = _fill_priority(
+            templates[picks],
+            rng.integers(min_percent, max_percent + 1, (count, max_sentences)),
+            rng.choice(quarters, (count, max_sentences)),
+        )
+        team_priorities = sentences[:, 0]
+        for k in range(1, max_sentences):
+            team_priorities = np.where(
+                num_sentences[mask] > k,
+                team_priorities + " " + sentences[:, k],
+                team_priorities,
+            )
+        priorities[mask] = team_priorities
+
+    df = pd.DataFrame(
+        {
+            "employee_id": rng.integers(0, 2**63 - 1, n, dtype=np.int64),
+            "name": names,
+            "job_title": job_titles,
+            "seniority_level": seniority_levels,
+            "team_function": team_functions,
+            "manager_org_priorities": priorities,
+        },
+        columns=COLUMNS,
+    )
+
+    # copy the job context of a random earlier row to simulate near-identical
+    # employees; sources are never copies themselves, since those are
+    # overwritten by the same assignment
+    is_duplicate = rng.random(n) < data_spec["duplicate_context_rate"]
+    is_duplicate[0] = False
+    duplicate_rows = np.flatnonzero(is_duplicate)
+    original_rows = np.flatnonzero(~is_duplicate)
+    num_earlier_originals = np.searchsorted(original_rows, duplicate_rows)
+    source_rows = original_rows[rng.integers(0, num_earlier_originals)]
+    df.loc[duplicate_rows, CONTEXT_COLUMNS] = df.loc[
+        source_rows, CONTEXT_COLUMNS
+    ].to_numpy()
+
+    for column, rate in data_spec["missing_rates"].items():
+        df.loc[rng.random(n) < rate, column] = None
+
+    return df
+
+
+def write_employee_data_chunks(
+    num_employees: int,
+    output_dir: str,
+    file_name: str,
+    file_format: str = "csv",
+    chunk_size: int = 100_000,
+    seed: int = 0,
+    data_spec: dict = DEFAULT_DATA_SPEC,
+) -> str:
+    """
+    Generate a roster chunk by chunk and write it without holding it in memory.
+
+    CSV chunks are appended to a single file; Parquet chunks are written as
+    part files in a directory (requires pyarrow). Each chunk has its own seed
+    derived from `seed`, so the output is reproducible for a given chunk size.
+
+    Args:
+        num_employees (int): Total number of rows to generate.
+        output_dir (str): The directory where the data will be saved.
+        file_name (str): The name of the file or directory (without extension).
+        file_format (str): "csv" or "parquet".
+        chunk_size (int): Rows generated and written at a time.
+        seed (int): Random seed.
+        data_spec (dict): See DEFAULT_DATA_SPEC.
+
+    Returns:
+        str: Path of the written file or directory.
+    """
+    if file_format == "csv":
+        output_path = os.path.join(output_dir, file_name + ".csv")
+    elif file_format == "parquet":
+        output_path = os.path.join(output_dir, file_name)
+        os.makedirs(output_path, exist_ok=True)
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    for chunk_index, start in enumerate(range(0, num_employees, chunk_size)):
+        df = generate_employee_data_fast(
+            min(chunk_size, num_employees - start),
+            seed=[seed, chunk_index],
+            data_spec=data_spec,
+        )
+        if file_format == "csv":
+            df.to_csv(
+                output_path,
+                mode="w" if start == 0 else "a",
+                index=False,
+                header=start == 0,
+            )
+        else:
+            df.to_parquet(
+                os.path.join(output_path, f"part-{chunk_index:05d}.parquet"),
+                index=False,
+            )
+    print(f"Data saved to {output_path}")
+    return output_path
+
+
+def main():
+    """
+    Generate a large synthetic employee roster from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic employee roster for scale testing."
+    )
+    parser.add_argument("--num-employees", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    write_employee_data_chunks(
+        args.num_employees,
+        args.output_dir,
+        f"synthetic_employee_data_{args.num_employees}_local_seed{args.seed}",
+        file_format=args.format,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Local mock of the OpenAI Responses API for load tests and profiling
+#
+# Usage:
+#   python -m scripts.mock_openai_server --port 8000 --latency 0.5
+#   OPENAI_BASE_URL=http://127.0.0.1:8000/v1 python main.py --profile --input <csv>
+import argparse
+import json
+import random
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMPLOYEE_KEY_PATTERN = re.compile(r"^Employee key: (\S+)$", re.MULTILINE)
+
+MOCK_GOALS = [
+    "Reduce P1 incident response time by 20% by the end of Q3.",
+    "Increase unit test coverage of the billing service from 60% to 80%.",
+    "Mentor two junior engineers through their first on-call rotation.",
+    "Ship the new onboarding flow to 100% of users by September.",
+    "Cut p95 latency of the search API below 300ms this quarter.",
+]
+
+
+def build_instance(schema: dict, defs: dict, employee_keys: list[str]):
+    """
+    Build a value that validates against a JSON schema generated by pydantic.
+    """
+    if "$ref" in schema:
+        return build_instance(defs[schema["$ref"].split("/")[-1]], defs, employee_keys)
+    if "enum" in schema:
+        return random.choice(schema["enum"])
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {
+            name: build_instance(property_schema, defs, employee_keys)
+            for name, property_schema in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        item_schema = schema["items"]
+        item_properties = defs.get(item_schema.get("$ref", "").split("/")[-1], {}).get(
+            "properties", {}
+        )
+        if "employee_key" in item_properties:
+            # packed prompts: one entry per employee key in the prompt
+            items = []
+            for employee_key in employee_keys:
+                item = build_instance(item_schema, defs, employee_keys)
+                item["employee_key"] = employee_key
+                items.append(item)
+            return items
+        min_items = schema.get("minItems", 1)
+        max_items = schema.get("maxItems", max(min_items, 4))
+        return [
+            build_instance(item_schema, defs, employee_keys)
+            for _ in range(random.randint(min_items, max_items))
+        ]
+    if schema_type == "string":
+        return random.choice(MOCK_GOALS)
+    if schema_type == "integer":
+        return random.randint(0, 100)
+    if schema_type == "number":
+        return round(random.random(), 2)
+    if schema_type == "boolean":
+        return random.random() < 0.5
+    return None
+
+
+def build_response(request: dict) -> dict:
+    text_format = request["text"]["format"]
+    prompt_text = "\n".join(
+        message["content"]
+        for message in request["input"]
+        if isinstance(message.get("content"), str)
+    )
+    employee_keys = EMPLOYEE_KEY_PATTERN.findall(prompt_text)
+    output = build_instance(
+        text_format["schema"], text_format["schema"].get("$defs", {}), employee_keys
+    )
+    output_text = json.dumps(output)
+    input_tokens = len(prompt_text) // 4
+    output_tokens = len(output_text) // 4
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": request.get("model", "mock"),
+        "output": [
+            {
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [
+                    {"type": "output_text", "text": output_text, "annotations": []}
+                ],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def make_handler(latency: float, error_rate: float):
+    class MockResponsesHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.endswith("/responses"):
+                self.send_error(404)
+                return
+            time.sleep(random.expovariate(1 / latency) if latency else 0)
+            if random.random() < error_rate:
+                self._send_json(500, {"error": {"message": "Mock server error"}})
+                return
+            self._send_json(200, build_response(json.loads(body)))
+
+        def _send_json(self, status: int, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockResponsesHandler
+
+
+class MockServer(ThreadingHTTPServer):
+    # batch runs open hundreds of connections at once
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve a mock OpenAI Responses API for local load tests."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--latency", type=float, default=0.5, help="Mean response latency (s)."
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of 500 responses."
+    )
+    args = parser.parse_args()
+
+    server = MockServer(
+        (args.host, args.port), make_handler(args.latency, args.error_rate)
+    )
+    print(f"Mock OpenAI server on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,81 @@
 ## Our task space: ["generate_employee_goals", "llm_judge_evaluate_goals"]
 
 
-from task_configs.schemas import EmployeeGoals, GoalEvaluation
+from task_configs.schemas import EmployeeGoals, GoalEvaluation, PackedEmployeeGoals
 
 LLM_API_TIMEOUT = 300  # seconds
 LLM_MAX_RETRIES = 0  # Number of retries for API calls
 
+# Logging, configured once per process by utils.logging_config.configure_logging
+LOGGING_CONFIG = {
+    "level": "INFO",
+    "json_format": True,  # structured JSON lines instead of plain text
+    "call_log_sample_rate": 0.01,  # fraction of LLM calls logged individually
+    "progress_interval": 10.0,  # seconds between throughput lines per task
+}
+
+# Semantic near-duplicate cache for llm judge evaluations
+GOAL_CACHE_CONFIG = {
+    "enabled": True,
+    "cache_dir": "output_data/goal_cache",
+    # cosine similarity above which a cached evaluation is reused
+    "similarity_threshold": 0.92,
+    "embedding_dim": 256,
+    "capacity": 100_000,  # max number of cached goal evaluations
+}
+
+# Limits on LLM requests shared by a whole batch run
+LLM_RATE_LIMIT_CONFIG = {
+    "max_concurrency": None,  # max requests in flight, None for unbounded
+    # estimated input + max output tokens per minute, None for unbounded
+    "tokens_per_minute": None,
+    # requests in flight of prioritized streaming runs when max_concurrency is
+    # None; with every request dispatched at once priorities would not matter
+    "priority_max_in_flight": 32,
+}
+
+# Token budgets applied to prompts before dispatch
+TOKEN_BUDGET_CONFIG = {
+    # tiktoken encoding used when tiktoken is installed
+    "tiktoken_encoding": "o200k_base",
+    # longer fields are cut to whole sentences within the budget
+    "max_field_tokens": {
+        "name": 20,
+        "job_title": 30,
+        "seniority_level": 10,
+        "team_function": 30,
+        "manager_org_priorities": 200,
+        "goal": 150,
+    },
+}
+
+# Live progress of batch runs
+PROGRESS_CONFIG = {
+    "enabled": True,  # redraw progress on the terminal during batch runs
+    "render_interval": 1.0,  # seconds between terminal redraws
+    "log_interval": 30.0,  # seconds between progress log events off a terminal
+    "rolling_window": 30.0,  # seconds used for req/s, tok/s and ETA
+    "metrics_port": None,  # serve http://127.0.0.1:<port>/metrics if set
+}
+
+# Offload response validation and output serialization from the event loop.
+# When enabled, responses are fetched with responses.create and their raw text
+# is validated in the pool, instead of by responses.parse on the loop.
+# scripts/benchmark_event_loop_lag.py, 20k requests, 2.3KB outputs, 1 CPU:
+#   off      wall 2.2-2.7s, loop lag p99 140-345ms
+#   thread   wall 2.4-2.9s, loop lag p99 275-335ms (GIL contention)
+#   process  wall 4.5-6.4s, loop lag p99 2-30ms
+# Validating these outputs costs ~5us each (0.1s per 20k), so most of the lag
+# is scheduling 20k concurrent requests; the process pool lowers p99 mainly by
+# pacing completions through max_pending, at about twice the wall time.
+# Offloading only pays off when a responsive loop matters more than wall time.
+LLM_OFFLOAD_CONFIG = {
+    "enabled": False,
+    "executor_type": "process",  # "process" or "thread"
+    "max_workers": 4,
+    "max_pending": 256,  # max validations queued or running at once
+}
+
 LLM_TASKS_CONFIG = {
     "generate_employee_goals": {
         "openai": {
@@ -49,6 +119,59 @@ If the employee is an individual contributor, focus on personal execution, deliv
             "max_retries": 3,
         },
     },
+    # several employees per request, failed employees are retried one by one
+    # with "generate_employee_goals"
+    "generate_employee_goals_packed": {
+        "openai": {
+            "llm_input_args": {
+                "model": "gpt-4.1-nano",
+                "system_prompt": """
+You are a helpful HR assistant designed to help employees set high-quality performance goals for the next 3–6 months.
+
+You will generate concise, measurable, role-appropriate goals based on each employee’s job context.
+
+Goals must be:
+- Specific and measurable
+- Aligned with the employee’s role, level, and org/team priorities
+- Clear and forward-looking
+
+Return 3–5 goals for every employee you are given. Avoid vague or generic phrasing.
+""".strip(),
+                "timeout": LLM_API_TIMEOUT,  # seconds
+                # per employee, multiplied by the number of employees in a pack
+                "max_output_tokens": 500,
+                "temperature": 0.7,
+                "top_p": 0.98,
+                "user_prompt": """
+The following are the contexts of {num_employees} employees:
+
+{employee_contexts}
+
+For each employee, generate 3–5 high-quality performance goals for the next 3–6 months.
+The goals should be specific, measurable, and tailored to the employee’s role, seniority, and organizational context.
+
+If an employee is in a managerial or leadership role, include aspects like team impact, delivery strategy, and people development.
+If an employee is an individual contributor, focus on personal execution, delivery, and growth within their role.
+
+Return exactly one entry per employee, using the employee key exactly as given.
+""".strip(),
+                "employee_prompt": """
+Employee key: {employee_key}
+- Name: {name}
+- Job Title: {job_title}
+- Seniority Level: {seniority_level}
+- Team/Function: {team_function}
+- Manager/Org Priorities: {manager_org_priorities}
+""".strip(),
+                "text_format": PackedEmployeeGoals,
+            },
+        },
+        # number of employees per request
+        "packing_factor": 10,
+        "Retry": {
+            "max_retries": 3,
+        },
+    },
     "llm_judge_evaluate_goal": {
         "openai": {
             "llm_input_args": {
@@ -1,5 +1,23 @@
+import logging
+import math
+import re
+from functools import lru_cache
+
 import pandas as pd
 
+from task_configs.config import TOKEN_BUDGET_CONFIG
+
+try:
+    import tiktoken
+except ImportError:  # optional, token counts fall back to a character estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# average characters per token used when tiktoken is not available
+CHARS_PER_TOKEN = 4
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
 
 # detect missing data, return missing keys
 def detect_missing_info(employee: dict) -> list:
@@ -22,6 +40,87 @@ def detect_missing_info(employee: dict) -> list:
     return missing_keys
 
 
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    if tiktoken is None:
+        return None
+    # the first load downloads the encoding, which can fail in many ways
+    # (network, cache permissions, unknown name); estimates work without it
+    try:
+        return tiktoken.get_encoding(TOKEN_BUDGET_CONFIG["tiktoken_encoding"])
+    except Exception as e:  # noqa: BLE001
+        logger.warning(f"Falling back to character-based token estimates: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text with a local tokenizer.
+    Args:
+        text (str): Text to estimate.
+    Returns:
+        int: Token count from tiktoken, or a character-based estimate.
+    """
+    tokenizer = get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# system prompts are the same for every request of a task
+estimate_static_tokens = lru_cache(maxsize=16)(estimate_tokens)
+
+
+def estimate_prompt_tokens(system_prompt: str, user_prompt: str) -> int:
+    return estimate_static_tokens(system_prompt) + estimate_tokens(user_prompt)
+
+
+def truncate_to_token_budget(text: str, max_tokens: int) -> str:
+    """
+    Shorten a text to at most max_tokens, keeping whole leading sentences when
+    possible and cutting at a token boundary otherwise.
+    Args:
+        text (str): Text to shorten.
+        max_tokens (int): Token budget.
+    Returns:
+        str: The text itself if within budget, otherwise the shortened text.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept_sentences = []
+    used_tokens = 0
+    for sentence in SENTENCE_END_PATTERN.split(text.strip()):
+        # +1 for the space joining sentences
+        sentence_tokens = estimate_tokens(sentence) + 1
+        if used_tokens + sentence_tokens > max_tokens:
+            break
+        kept_sentences.append(sentence)
+        used_tokens += sentence_tokens
+    if kept_sentences:
+        return " ".join(kept_sentences)
+
+    # leave room for the ellipsis marking the cut
+    tokenizer = get_tokenizer()
+    if tokenizer is not None:
+        kept_tokens = tokenizer.encode(text)[: max_tokens - estimate_tokens("...")]
+        return tokenizer.decode(kept_tokens).rstrip() + "..."
+    return text[: max_tokens * CHARS_PER_TOKEN - len("...")].rstrip() + "..."
+
+
+def apply_field_token_budgets(employee_context: dict) -> dict:
+    """
+    Return a copy of the employee context with overlong text fields truncated
+    to their budget in TOKEN_BUDGET_CONFIG.
+    """
+    budgeted_context = dict(employee_context)
+    for key, max_tokens in TOKEN_BUDGET_CONFIG["max_field_tokens"].items():
+        value = budgeted_context.get(key)
+        if isinstance(value, str):
+            budgeted_context[key] = truncate_to_token_budget(value, max_tokens)
+    return budgeted_context
+
+
 def format_goal_generation_prompt(
     employee_context: dict, llm_input_args_config: dict
 ) -> dict:
@@ -33,6 +132,7 @@ def format_goal_generation_prompt(
     Returns:
         dict: Formatted prompt dictionary.
     """
+    employee_context = apply_field_token_budgets(employee_context)
     name = employee_context.get("name", "Unknown")
     job_title = employee_context.get("job_title", "Unknown")
     seniority_level = employee_context.get("seniority_level", "Unknown")
@@ -54,10 +154,64 @@ def format_goal_generation_prompt(
         "system_prompt": llm_input_args_config["system_prompt"],
         "user_prompt": user_prompt,
         "metadata": {
+            "employee_id": employee_context.get("employee_id"),
             "employee_name": name,
             "job_title": job_title,
         },
         "missing_info": missing_keys,
+        "estimated_input_tokens": estimate_prompt_tokens(
+            llm_input_args_config["system_prompt"], user_prompt
+        ),
+    }
+
+
+def format_packed_goal_generation_prompt(
+    employee_contexts: list[dict], llm_input_args_config: dict
+) -> dict:
+    """
+    Format one prompt for LLM to generate goals for several employees at once.
+    Employees are identified by short keys (E1, E2, ...) in the prompt, which
+    are cheaper than real employee ids and are mapped back by position.
+    Args:
+        employee_contexts (list[dict]): Employee information, one dict each.
+        llm_input_args_config (dict): Configuration for LLM input arguments.
+    Returns:
+        dict: Formatted prompt dictionary, with the employee keys in metadata.
+    """
+    employee_keys = []
+    employee_prompts = []
+    for i, employee_context in enumerate(employee_contexts):
+        employee_context = apply_field_token_budgets(employee_context)
+        employee_key = f"E{i + 1}"
+        employee_keys.append(employee_key)
+        employee_prompts.append(
+            llm_input_args_config["employee_prompt"].format(
+                employee_key=employee_key,
+                name=employee_context.get("name", "Unknown"),
+                job_title=employee_context.get("job_title", "Unknown"),
+                seniority_level=employee_context.get("seniority_level", "Unknown"),
+                team_function=employee_context.get("team_function", "Unknown"),
+                manager_org_priorities=employee_context.get(
+                    "manager_org_priorities", "Not provided"
+                ),
+            )
+        )
+
+    user_prompt = llm_input_args_config["user_prompt"].format(
+        num_employees=len(employee_contexts),
+        employee_contexts="\n\n".join(employee_prompts),
+    )
+
+    return {
+        "system_prompt": llm_input_args_config["system_prompt"],
+        "user_prompt": user_prompt,
+        "metadata": {
+            "employee_keys": employee_keys,
+        },
+        "missing_info": [],
+        "estimated_input_tokens": estimate_prompt_tokens(
+            llm_input_args_config["system_prompt"], user_prompt
+        ),
     }
 
 
@@ -75,13 +229,16 @@ def format_llm_judge_evaluate_goal_prompt(
     Returns:
         dict: Formatted prompt dictionary.
     """
+    employee_context = apply_field_token_budgets(employee_context)
     name = employee_context.get("name", "Unknown")
     job_title = employee_context.get("job_title", "Unknown")
     seniority_level = employee_context.get("seniority_level", "Unknown")
     team_function = employee_context.get("team_function", "Unknown")
 
     user_prompt = llm_input_args_config["user_prompt"].format(
-        goal=goal,
+        goal=truncate_to_token_budget(
+            goal, TOKEN_BUDGET_CONFIG["max_field_tokens"]["goal"]
+        ),
         name=name,
         job_title=job_title,
         seniority_level=seniority_level,
@@ -93,9 +250,13 @@ def format_llm_judge_evaluate_goal_prompt(
         "system_prompt": llm_input_args_config["system_prompt"],
         "user_prompt": user_prompt,
         "metadata": {
+            "employee_id": employee_context.get("employee_id"),
             "employee_name": name,
             "job_title": job_title,
             "goal": goal,
         },
         "missing_info": missing_keys,
+        "estimated_input_tokens": estimate_prompt_tokens(
+            llm_input_args_config["system_prompt"], user_prompt
+        ),
     }
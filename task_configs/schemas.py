@@ -13,6 +13,17 @@ class EmployeeGoals(BaseModel):
     )
 
 
+# json schema for packed goals generation output, several employees per request
+# goal counts are validated per employee so one bad entry does not fail the pack
+class EmployeeGoalsEntry(BaseModel):
+    employee_key: str = Field(..., description="Employee key exactly as given")
+    goals: list[str] = Field(..., description="List of goals for this employee")
+
+
+class PackedEmployeeGoals(BaseModel):
+    employees: list[EmployeeGoalsEntry]
+
+
 # json schema for llm judge goal evaluation output
 class ClarityEvaluation(BaseModel):
     score: Literal["Low", "Medium", "High"]
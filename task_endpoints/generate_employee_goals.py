@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import logging
 import os
@@ -8,21 +9,32 @@ from dotenv import load_dotenv
 
 # Load OpenAI API client
 from openai import AsyncOpenAI, OpenAI
+from pydantic import ValidationError
 
-from llm_interface.async_llm_inference import batch_generate
-from llm_interface.llm_inference import generate_with_openai
-from task_configs.config import LLM_API_TIMEOUT, LLM_MAX_RETRIES, LLM_TASKS_CONFIG
-from task_configs.prompt_prep import format_goal_generation_prompt
+from llm_interface.async_llm_inference import batch_generate, iter_generate
+from llm_interface.llm_inference import LLMResult, generate_with_openai
+from llm_interface.offload import make_offloader
+from llm_interface.rate_limiter import make_request_limiter
+from task_configs.config import (
+    LLM_API_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_OFFLOAD_CONFIG,
+    LLM_RATE_LIMIT_CONFIG,
+    LLM_TASKS_CONFIG,
+)
+from task_configs.prompt_prep import (
+    format_goal_generation_prompt,
+    format_packed_goal_generation_prompt,
+)
+from task_configs.schemas import EmployeeGoals
 
 ## import from local modules
 from utils.data_prep import load_employee_data
-
-# Configure basic logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+from utils.logging_config import configure_logging, get_call_logger
+from utils.loop_lag import EventLoopLagMonitor
+from utils.priority import compute_priorities
+from utils.profiling import add_profile_arguments, profiling_session, stage
+from utils.progress import get_progress
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -92,41 +104,276 @@ def generate_single_employee_goals(employee_data: dict, llm_input_args_config: d
     # route to the correct function based on the given task type
     prompt_dict = format_goal_generation_prompt(employee_data, llm_input_args_config)
     # generate the output using OpenAI client
-    llm_output = generate_with_openai(client, prompt_dict, llm_input_args_config)
+    llm_output = generate_with_openai(
+        client, prompt_dict, llm_input_args_config, task="generate_employee_goals"
+    )
     return llm_output
 
 
 # generate goals for a batch of employees
-def generate_batch_employee_goals(df_employee, llm_input_args_config: dict) -> list:
+def generate_batch_employee_goals(
+    df_employee, llm_input_args_config: dict, return_model: bool = False
+) -> list:
     """
     Generate goals for a batch of employees using OpenAI client.
 
     Args:
         df_employee (DataFrame): DataFrame containing employee data.
         llm_input_args_config (dict): Configuration for LLM input arguments.
+        return_model (bool): Return LLMResult records instead of dicts.
 
     Returns:
         list: List of generated goals for each employee.
     """
     # prepare batch data for processing
-    employee_dict_list = df_employee.to_dict(orient="records")
+    with stage("pandas"):
+        employee_dict_list = df_employee.to_dict(orient="records")
     # prepare batch data for LLM input
-    formatted_prompt_dict_list = [
-        format_goal_generation_prompt(employee_data, llm_input_args_config)
-        for employee_data in employee_dict_list
-    ]
+    with stage("prompt_prep"):
+        formatted_prompt_dict_list = [
+            format_goal_generation_prompt(employee_data, llm_input_args_config)
+            for employee_data in employee_dict_list
+        ]
+    offloader = make_offloader(LLM_OFFLOAD_CONFIG)
+
+    async def run_batch_generate():
+        limiter = make_request_limiter(LLM_RATE_LIMIT_CONFIG)
+        get_progress().concurrency_limit = limiter.max_concurrency
+        async with EventLoopLagMonitor() as lag_monitor:
+            outputs = await batch_generate(
+                async_client,
+                formatted_prompt_dict_list,
+                llm_input_args_config,
+                return_model=return_model,
+                offloader=offloader,
+                task="generate_employee_goals",
+                limiter=limiter,
+            )
+        logger.info(f"Event loop lag during goal generation: {lag_monitor.summary()}")
+        return outputs
+
     # Run async goal generation
-    all_outputs = asyncio.run(
-        batch_generate(
+    try:
+        all_outputs = asyncio.run(run_batch_generate())
+    finally:
+        if offloader:
+            offloader.shutdown()
+    get_call_logger("generate_employee_goals").log_progress()
+    return all_outputs
+
+
+# generate goals with several employees per request
+async def generate_packed_employee_goals_async(
+    async_client,
+    employee_dict_list: list[dict],
+    packing_factor: int,
+    limiter=None,
+    offloader=None,
+    return_model: bool = False,
+) -> tuple[list, dict]:
+    """
+    Generate goals for a batch of employees, `packing_factor` employees per
+    request, so the system prompt and instructions are sent once per pack.
+
+    The goals of each employee in a packed response are validated against
+    EmployeeGoals on their own. Employees that are missing from the response,
+    have invalid goals or were in a failed request are re-dispatched
+    individually with the single-employee task.
+
+    Args:
+        async_client: Async OpenAI client instance.
+        employee_dict_list (list[dict]): Employee records.
+        packing_factor (int): Number of employees per packed request.
+        limiter (RequestLimiter, optional): Shared request limiter of the run.
+        offloader (BoundedOffloader, optional): Worker pool for validation.
+        return_model (bool): Return LLMResult records instead of dicts.
+
+    Returns:
+        tuple[list, dict]: Generated goals and metadata for each employee in
+            input order, same as generate_batch_employee_goals, and request counts.
+    """
+    single_config = LLM_TASKS_CONFIG["generate_employee_goals"]["openai"][
+        "llm_input_args"
+    ]
+    packed_config = LLM_TASKS_CONFIG["generate_employee_goals_packed"]["openai"][
+        "llm_input_args"
+    ]
+    packed_config = {
+        **packed_config,
+        "max_output_tokens": packed_config["max_output_tokens"] * packing_factor,
+    }
+    num_employees = len(employee_dict_list)
+    packs = [
+        range(start, min(start + packing_factor, num_employees))
+        for start in range(0, num_employees, packing_factor)
+    ]
+    with stage("prompt_prep"):
+        single_prompt_dicts = [
+            format_goal_generation_prompt(employee_data, single_config)
+            for employee_data in employee_dict_list
+        ]
+        packed_prompt_dicts = [
+            format_packed_goal_generation_prompt(
+                [employee_dict_list[i] for i in pack], packed_config
+            )
+            for pack in packs
+        ]
+
+    all_outputs = [None] * num_employees
+    async for pack_index, result in iter_generate(
+        async_client,
+        packed_prompt_dicts,
+        packed_config,
+        return_model=True,
+        offloader=offloader,
+        task="generate_employee_goals_packed",
+        limiter=limiter,
+        return_exceptions=True,
+    ):
+        if isinstance(result, Exception):
+            logger.warning(f"Packed request failed, retrying individually: {result}")
+            continue
+        with stage("parse"):
+            goals_by_key = {
+                entry.employee_key: entry.goals for entry in result.output.employees
+            }
+            for employee_key, i in zip(
+                result.metadata["employee_keys"], packs[pack_index]
+            ):
+                try:
+                    employee_goals = EmployeeGoals(goals=goals_by_key[employee_key])
+                except (KeyError, ValidationError):
+                    continue
+                all_outputs[i] = LLMResult(
+                    employee_goals,
+                    single_prompt_dicts[i].get("metadata", {}),
+                    single_prompt_dicts[i].get("missing_info", []),
+                )
+
+    # re-dispatch only the employees without valid goals
+    failed_indices = [i for i, output in enumerate(all_outputs) if output is None]
+    if failed_indices:
+        fallback_outputs = await batch_generate(
             async_client,
-            formatted_prompt_dict_list,
-            llm_input_args_config,
+            [single_prompt_dicts[i] for i in failed_indices],
+            single_config,
+            return_model=True,
+            offloader=offloader,
+            task="generate_employee_goals",
+            limiter=limiter,
         )
+        for i, output in zip(failed_indices, fallback_outputs):
+            all_outputs[i] = output
+
+    packing_stats = {
+        "employees": num_employees,
+        "packing_factor": packing_factor,
+        "packed_requests": len(packs),
+        "fallback_requests": len(failed_indices),
+    }
+    logger.info(f"Packed goal generation: {packing_stats}")
+    if not return_model:
+        all_outputs = [output.to_dict() for output in all_outputs]
+    return all_outputs, packing_stats
+
+
+def generate_packed_batch_employee_goals(
+    df_employee, packing_factor: int | None = None, return_model: bool = False
+) -> list:
+    """
+    Generate goals for a batch of employees with several employees per request.
+
+    Args:
+        df_employee (DataFrame): DataFrame containing employee data.
+        packing_factor (int, optional): Employees per request, defaults to the
+            "packing_factor" of generate_employee_goals_packed in LLM_TASKS_CONFIG.
+        return_model (bool): Return LLMResult records instead of dicts.
+
+    Returns:
+        list: List of generated goals for each employee.
+    """
+    packing_factor = (
+        packing_factor
+        or LLM_TASKS_CONFIG["generate_employee_goals_packed"]["packing_factor"]
     )
+    with stage("pandas"):
+        employee_dict_list = df_employee.to_dict(orient="records")
+    offloader = make_offloader(LLM_OFFLOAD_CONFIG)
+
+    async def run_packed_generate():
+        limiter = make_request_limiter(LLM_RATE_LIMIT_CONFIG)
+        get_progress().concurrency_limit = limiter.max_concurrency
+        async with EventLoopLagMonitor() as lag_monitor:
+            outputs, _ = await generate_packed_employee_goals_async(
+                async_client,
+                employee_dict_list,
+                packing_factor,
+                limiter,
+                offloader,
+                return_model,
+            )
+        logger.info(f"Event loop lag during goal generation: {lag_monitor.summary()}")
+        return outputs
+
+    try:
+        all_outputs = asyncio.run(run_packed_generate())
+    finally:
+        if offloader:
+            offloader.shutdown()
+    get_call_logger("generate_employee_goals_packed").log_progress()
     return all_outputs
 
 
+# generate goals for a batch of employees, yielding them as they complete
+async def iter_batch_employee_goals(
+    employee_dict_list: list[dict],
+    llm_input_args_config: dict,
+    priority_key=None,
+    limiter=None,
+    offloader=None,
+    return_exceptions: bool = False,
+    return_model: bool = False,
+):
+    """
+    Generate goals for a batch of employees and yield each result as soon as
+    it lands, scheduling employees by priority.
+
+    Args:
+        employee_dict_list (list[dict]): Employee records.
+        llm_input_args_config (dict): Configuration for LLM input arguments.
+        priority_key (callable, optional): Key from utils.priority, lowest first.
+        limiter (RequestLimiter, optional): Shared request limiter of the run.
+        offloader (BoundedOffloader, optional): Worker pool for validation.
+        return_exceptions (bool): Yield failures instead of raising them.
+        return_model (bool): Yield LLMResult records instead of dicts.
+
+    Yields:
+        tuple[int, dict | LLMResult | Exception]: Index of the employee in
+            employee_dict_list and its generated goals and metadata.
+    """
+    with stage("prompt_prep"):
+        formatted_prompt_dict_list = [
+            format_goal_generation_prompt(employee_data, llm_input_args_config)
+            for employee_data in employee_dict_list
+        ]
+    async for index, output in iter_generate(
+        async_client,
+        formatted_prompt_dict_list,
+        llm_input_args_config,
+        return_model=return_model,
+        offloader=offloader,
+        task="generate_employee_goals",
+        limiter=limiter,
+        priorities=compute_priorities(
+            priority_key, employee_dict_list, formatted_prompt_dict_list
+        ),
+        return_exceptions=return_exceptions,
+    ):
+        yield index, output
+
+
 def main():
+    configure_logging()
     task_type = "generate_employee_goals"
     llm_input_args_config = LLM_TASKS_CONFIG[task_type]["openai"]["llm_input_args"]
     is_single_input = False  # Set to True for single employee input
@@ -162,4 +409,10 @@ def main():
 
 # Example Usage
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate employee goals.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    with profiling_session(
+        args.profile, args.profiler, "output_data", "profile_generate_employee_goals"
+    ):
+        main()
@@ -11,15 +11,22 @@ from llm_interface.async_llm_inference import batch_generate
 
 ## import from local modules
 from llm_interface.llm_inference import generate_with_openai
-from task_configs.config import LLM_API_TIMEOUT, LLM_MAX_RETRIES, LLM_TASKS_CONFIG
-from task_configs.prompt_prep import format_llm_judge_evaluate_goal_prompt
-
-# Configure basic logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
+from llm_interface.offload import make_offloader
+from llm_interface.rate_limiter import make_request_limiter
+from task_configs.config import (
+    GOAL_CACHE_CONFIG,
+    LLM_API_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_OFFLOAD_CONFIG,
+    LLM_RATE_LIMIT_CONFIG,
+    LLM_TASKS_CONFIG,
 )
+from task_configs.prompt_prep import format_llm_judge_evaluate_goal_prompt
+from utils.goal_cache import SemanticGoalCache, judge_fingerprint
+from utils.logging_config import get_call_logger
+from utils.loop_lag import EventLoopLagMonitor
+from utils.profiling import stage
+from utils.progress import get_progress
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -42,6 +49,23 @@ async_client = AsyncOpenAI(
     timeout=LLM_API_TIMEOUT,
     max_retries=LLM_MAX_RETRIES,
 )
+# Set semantic near-duplicate cache for goal evaluations
+goal_cache = (
+    SemanticGoalCache(
+        cache_dir=GOAL_CACHE_CONFIG["cache_dir"],
+        similarity_threshold=GOAL_CACHE_CONFIG["similarity_threshold"],
+        embedding_dim=GOAL_CACHE_CONFIG["embedding_dim"],
+        capacity=GOAL_CACHE_CONFIG["capacity"],
+        judge_fingerprint=judge_fingerprint(
+            LLM_TASKS_CONFIG["llm_judge_evaluate_goal"]["openai"]["llm_input_args"]
+        ),
+        text_format=LLM_TASKS_CONFIG["llm_judge_evaluate_goal"]["openai"][
+            "llm_input_args"
+        ]["text_format"],
+    )
+    if GOAL_CACHE_CONFIG["enabled"]
+    else None
+)
 
 
 def evaluate_single_goal(employee_data):
@@ -53,31 +77,86 @@ def evaluate_single_goal(employee_data):
         task_type, employee_data, llm_input_args_config, goal=employee_data["goals"][0]
     )
     # generate the output using OpenAI client
-    llm_output = generate_with_openai(client, prompt_dict, llm_input_args_config)
+    llm_output = generate_with_openai(
+        client, prompt_dict, llm_input_args_config, task=task_type
+    )
 
     return llm_output
 
 
-async def process_single_employee_goals(employee_data, llm_input_args_config):
+async def process_single_employee_goals(
+    employee_data, llm_input_args_config, offloader=None, limiter=None
+):
     """
     Process goals for a single employee asynchronously.
+
+    Every evaluation is returned as a GoalEvaluation model, whether it comes
+    from the judge or the cache; models are dumped by the writers.
+
+    Goals that are near-duplicates of an already evaluated goal for the same
+    role, seniority and team reuse the cached evaluation instead of calling the
+    judge. Near-duplicates of a goal still being evaluated, e.g. by another
+    employee of the same batch, wait for that evaluation.
     """
+    goals = employee_data["goals"]
+    bucket_fields = (
+        employee_data.get("job_title"),
+        employee_data.get("seniority_level"),
+        employee_data.get("team_function"),
+    )
+    all_outputs = [None] * len(goals)
+    pending_indices = []
+    waiting = {}
+    # look up and reserve all goals before the first await, so concurrent
+    # employees see each other's goals as in flight
+    with stage("goal_cache"):
+        for i, goal in enumerate(goals):
+            cached_output = (
+                goal_cache.lookup(goal, *bucket_fields, reserve=True)
+                if goal_cache
+                else None
+            )
+            if isinstance(cached_output, asyncio.Future):
+                waiting[i] = cached_output
+            elif cached_output is not None:
+                all_outputs[i] = cached_output
+            else:
+                pending_indices.append(i)
+
     # Prepare the prompt for LLM to evaluate the quality of generated goals
-    prompt_dicts = [
-        format_llm_judge_evaluate_goal_prompt(
-            goal, employee_data, llm_input_args_config
-        )
-        for goal in employee_data["goals"]
-    ]
+    with stage("prompt_prep"):
+        prompt_dicts = [
+            format_llm_judge_evaluate_goal_prompt(
+                goals[i], employee_data, llm_input_args_config
+            )
+            for i in pending_indices
+        ]
 
     # Generate outputs using async OpenAI client
-    all_outputs = await batch_generate(
-        async_client, prompt_dicts, llm_input_args_config
-    )
-    # remove metadata and missing_info from the output
-    for output in all_outputs:
-        output.pop("metadata", None)
-        output.pop("missing_info", None)
+    try:
+        new_results = await batch_generate(
+            async_client,
+            prompt_dicts,
+            llm_input_args_config,
+            return_model=True,
+            offloader=offloader,
+            task="llm_judge_evaluate_goal",
+            limiter=limiter,
+        )
+    except BaseException as e:
+        if goal_cache:
+            for i in pending_indices:
+                goal_cache.release(goals[i], *bucket_fields, e)
+        raise
+    # keep only the evaluation model, without metadata and missing_info; it is
+    # dumped when the results are written
+    for i, result in zip(pending_indices, new_results):
+        all_outputs[i] = result.output
+        if goal_cache:
+            with stage("goal_cache"):
+                goal_cache.add(goals[i], *bucket_fields, result.output)
+    for i, pending_output in waiting.items():
+        all_outputs[i] = await pending_output
     return all_outputs
 
 
@@ -85,19 +164,35 @@ def process_all_employee_goals(employees_data):
     task_type = "llm_judge_evaluate_goal"
     llm_input_args_config = LLM_TASKS_CONFIG[task_type]["openai"]["llm_input_args"]
 
+    offloader = make_offloader(LLM_OFFLOAD_CONFIG)
+
     async def process_all_employees():
+        limiter = make_request_limiter(LLM_RATE_LIMIT_CONFIG)
+        get_progress().concurrency_limit = limiter.max_concurrency
         tasks = [
-            process_single_employee_goals(employee_data, llm_input_args_config)
+            process_single_employee_goals(
+                employee_data, llm_input_args_config, offloader, limiter
+            )
             for employee_data in employees_data
         ]
-        results = await asyncio.gather(*tasks)
+        async with EventLoopLagMonitor() as lag_monitor:
+            results = await asyncio.gather(*tasks)
+        logger.info(f"Event loop lag during goal evaluation: {lag_monitor.summary()}")
         return results
 
     # Run the async function
-    all_results = asyncio.run(process_all_employees())
+    try:
+        all_results = asyncio.run(process_all_employees())
+    finally:
+        if offloader:
+            offloader.shutdown()
+    get_call_logger(task_type).log_progress()
     num_of_employees = len(all_results)
     num_of_goals = sum(len(employee["goals"]) for employee in employees_data)
     logger.info(
         f"Processed {num_of_goals} goals for {num_of_employees} employees asynchronously."
     )
+    if goal_cache:
+        goal_cache.flush()
+        logger.info(f"Goal evaluation cache stats: {goal_cache.stats()}")
     return all_results
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import random
+import unittest
+from types import SimpleNamespace
+
+from llm_interface.async_llm_inference import iter_generate
+from task_configs.schemas import EmployeeGoals
+
+LLM_INPUT_ARGS_CONFIG = {"model": "test-model", "text_format": EmployeeGoals}
+OUTPUT_TEXT = json.dumps({"goals": ["Goal one.", "Goal two.", "Goal three."]})
+
+
+class SimulatedResponses:
+    def __init__(self):
+        self.random = random.Random(0)
+
+    async def parse(self, **llm_input_args):
+        await asyncio.sleep(self.random.uniform(0.005, 0.05))
+        return SimpleNamespace(output_text=OUTPUT_TEXT, output_parsed=None)
+
+
+class IterGenerateTest(unittest.IsolatedAsyncioTestCase):
+    async def test_priorities_apply_without_a_concurrency_limit(self):
+        num_prompts = 200
+        prompt_dicts = [
+            {"system_prompt": "", "user_prompt": str(i)} for i in range(num_prompts)
+        ]
+        # the last prompts are the most important
+        priorities = [num_prompts - i for i in range(num_prompts)]
+
+        completion_order = [
+            index
+            async for index, _ in iter_generate(
+                SimpleNamespace(responses=SimulatedResponses()),
+                prompt_dicts,
+                LLM_INPUT_ARGS_CONFIG,
+                priorities=priorities,
+            )
+        ]
+
+        self.assertEqual(sorted(completion_order), list(range(num_prompts)))
+        first_completed = set(completion_order[: num_prompts // 4])
+        self.assertTrue(all(i >= num_prompts // 2 for i in first_completed))
+
+
+if __name__ == "__main__":
+    unittest.main()
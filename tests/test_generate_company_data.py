@@ -0,0 +1,49 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from task_configs.schemas import EmployeeGoals, GoalEvaluation
+
+EVALUATION = {
+    "clarity": {"score": "High", "reason": "Clear target."},
+    "specificity": {"score": "High", "reason": "Names the metric."},
+    "role_fit": {"score": "Yes", "reason": "Fits an SRE."},
+    "measurability": {"score": "Yes", "reason": "Tracked in %."},
+}
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec("mostlyai.mock") and importlib.util.find_spec("pyarrow"),
+    "requires mostlyai-mock and pyarrow",
+)
+class WriteToParquetTest(unittest.TestCase):
+    def test_writes_model_cells_as_their_dumps(self):
+        from scripts.generate_company_data import write_to_parquet
+
+        goals = EmployeeGoals(goals=["Goal one.", "Goal two.", "Goal three."])
+        df = pd.DataFrame(
+            {
+                "employee_id": [1],
+                "goals": [goals],
+                "evaluated_goals": [[GoalEvaluation.model_validate(EVALUATION)] * 2],
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            write_to_parquet(df, output_dir, "employees")
+            written = pd.read_parquet(os.path.join(output_dir, "employees.parquet"))
+
+        self.assertEqual(written["goals"][0]["goals"].tolist(), goals.goals)
+        self.assertEqual(
+            [dict(evaluation) for evaluation in written["evaluated_goals"][0]],
+            [EVALUATION] * 2,
+        )
+        # the caller's DataFrame keeps its models
+        self.assertIs(df["goals"][0], goals)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import re
+import unittest
+from types import SimpleNamespace
+
+from task_configs.schemas import EmployeeGoals, PackedEmployeeGoals
+
+# the endpoint module creates OpenAI clients on import; no request is sent with them
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENAI_ORG_ID", "test")
+from task_endpoints.generate_employee_goals import (
+    generate_packed_employee_goals_async,
+)
+
+NAME_PATTERN = re.compile(r"^- Name: (.+)$", re.MULTILINE)
+EMPLOYEE_KEY_PATTERN = re.compile(r"^Employee key: (\S+)$", re.MULTILINE)
+NAMES = ["Ava Liu", "Liam Smith", "Noah Garcia", "Emma Patel", "Mia Kim", "Omar Cohen"]
+# left out of its packed response, and given too few goals in it
+MISSING_NAME = "Liam Smith"
+INVALID_NAME = "Mia Kim"
+
+
+def goals_for(name: str, count: int = 3) -> list[str]:
+    return [f"Goal {j} of {name}." for j in range(1, count + 1)]
+
+
+class SimulatedResponses:
+    def __init__(self):
+        self.single_requests = []
+
+    async def parse(self, text_format, **llm_input_args):
+        user_prompt = llm_input_args["input"][1]["content"]
+        names = NAME_PATTERN.findall(user_prompt)
+        if text_format is PackedEmployeeGoals:
+            employee_keys = EMPLOYEE_KEY_PATTERN.findall(user_prompt)
+            output = PackedEmployeeGoals(
+                employees=[
+                    {
+                        "employee_key": employee_key,
+                        "goals": goals_for(name, 2 if name == INVALID_NAME else 3),
+                    }
+                    for employee_key, name in zip(employee_keys, names)
+                    if name != MISSING_NAME
+                ]
+            )
+        else:
+            self.single_requests.extend(names)
+            output = EmployeeGoals(goals=goals_for(names[0]))
+        # finish in reverse order to check that outputs are put back in order
+        await asyncio.sleep(0.001 * (len(NAMES) - NAMES.index(names[0])))
+        return SimpleNamespace(
+            output_text=output.model_dump_json(), output_parsed=output, usage=None
+        )
+
+
+class GeneratePackedEmployeeGoalsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_redispatches_only_missing_and_invalid_employees(self):
+        responses = SimulatedResponses()
+        employee_dict_list = [
+            {
+                "employee_id": i,
+                "name": name,
+                "job_title": "Software Engineer",
+                "seniority_level": "Senior",
+                "team_function": "Engineering",
+                "manager_org_priorities": "Cut p95 API latency by 20% in Q3 2026.",
+            }
+            for i, name in enumerate(NAMES)
+        ]
+
+        outputs, packing_stats = await generate_packed_employee_goals_async(
+            SimpleNamespace(responses=responses),
+            employee_dict_list,
+            packing_factor=3,
+            return_model=True,
+        )
+
+        self.assertCountEqual(responses.single_requests, [MISSING_NAME, INVALID_NAME])
+        self.assertEqual(packing_stats["packed_requests"], 2)
+        self.assertEqual(packing_stats["fallback_requests"], 2)
+        self.assertEqual(
+            [output.output.goals for output in outputs],
+            [goals_for(name) for name in NAMES],
+        )
+        self.assertEqual(
+            [output.metadata["employee_id"] for output in outputs],
+            list(range(len(NAMES))),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
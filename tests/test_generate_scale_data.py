@@ -0,0 +1,42 @@
+import unittest
+
+from scripts.generate_scale_data import (
+    CONTEXT_COLUMNS,
+    DEFAULT_DATA_SPEC,
+    generate_employee_data_fast,
+)
+
+# without missing fields every context should be unique unless copied
+DATA_SPEC = {**DEFAULT_DATA_SPEC, "missing_rates": {}}
+
+
+class GenerateEmployeeDataFastTest(unittest.TestCase):
+    def test_duplicate_context_share_tracks_the_rate(self):
+        for rate in (0.0, 0.3, 0.6, 0.9):
+            with self.subTest(rate=rate):
+                df = generate_employee_data_fast(
+                    20_000,
+                    seed=0,
+                    data_spec={**DATA_SPEC, "duplicate_context_rate": rate},
+                )
+
+                duplicate_share = df.duplicated(CONTEXT_COLUMNS).mean()
+
+                self.assertAlmostEqual(duplicate_share, rate, delta=0.02)
+
+    def test_priorities_do_not_repeat_sentences(self):
+        df = generate_employee_data_fast(5_000, seed=0, data_spec=DATA_SPEC)
+
+        for priorities in df["manager_org_priorities"]:
+            sentences = priorities.split(". ")
+            self.assertEqual(len(sentences), len(set(sentences)), priorities)
+
+    def test_same_seed_gives_the_same_roster(self):
+        first = generate_employee_data_fast(1_000, seed=7)
+        second = generate_employee_data_fast(1_000, seed=7)
+
+        self.assertTrue(first.equals(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from task_configs.schemas import GoalEvaluation
+from utils.goal_cache import HashingEmbedder, SemanticGoalCache
+
+GOAL = "Reduce P1 incident response time by 20% by the end of Q3."
+NEAR_DUPLICATE = "Reduce P1 incident response time by 25% by the end of Q3."
+OTHER_GOAL = "Mentor two junior engineers through their first on-call rotation."
+ROLE = ("Site Reliability Engineer", "Senior", "Engineering")
+EVALUATION = {
+    "clarity": {"score": "High", "reason": "Clear target."},
+    "specificity": {"score": "High", "reason": "Names the metric."},
+    "role_fit": {"score": "Yes", "reason": "Fits an SRE."},
+    "measurability": {"score": "Yes", "reason": "Tracked in %."},
+}
+
+
+class SemanticGoalCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self._temp_dir.name
+        embedder = HashingEmbedder()
+        self.similarity = float(embedder.embed(GOAL) @ embedder.embed(NEAR_DUPLICATE))
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def make_cache(self, **kwargs) -> SemanticGoalCache:
+        cache = SemanticGoalCache(self.cache_dir, capacity=1_000, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    async def test_near_duplicate_above_threshold_hits(self):
+        cache = self.make_cache(similarity_threshold=self.similarity - 0.01)
+        cache.add(GOAL, *ROLE, EVALUATION)
+
+        self.assertEqual(cache.lookup(NEAR_DUPLICATE, *ROLE), EVALUATION)
+        self.assertEqual(cache.hits, 1)
+
+    async def test_near_duplicate_below_threshold_misses(self):
+        cache = self.make_cache(similarity_threshold=self.similarity + 0.01)
+        cache.add(GOAL, *ROLE, EVALUATION)
+
+        self.assertIsNone(cache.lookup(NEAR_DUPLICATE, *ROLE))
+        self.assertIsNone(cache.lookup(OTHER_GOAL, *ROLE))
+        self.assertEqual(cache.misses, 2)
+
+    async def test_other_bucket_misses(self):
+        cache = self.make_cache()
+        cache.add(GOAL, *ROLE, EVALUATION)
+
+        self.assertIsNone(cache.lookup(GOAL, "Product Manager", "Senior", "Product"))
+        self.assertIsNone(cache.lookup(GOAL, "Site Reliability Engineer", "Junior"))
+
+    async def test_pending_reservation_resolves_to_added_evaluation(self):
+        cache = self.make_cache()
+
+        self.assertIsNone(cache.lookup(GOAL, *ROLE, reserve=True))
+        pending = cache.lookup(NEAR_DUPLICATE, *ROLE)
+        self.assertIsInstance(pending, asyncio.Future)
+        cache.add(GOAL, *ROLE, EVALUATION)
+
+        self.assertEqual(await pending, EVALUATION)
+        self.assertEqual(cache.pending_hits, 1)
+        # the reservation is resolved, later lookups hit the stored entry
+        self.assertEqual(cache.lookup(NEAR_DUPLICATE, *ROLE), EVALUATION)
+
+    async def test_release_propagates_the_error(self):
+        cache = self.make_cache()
+        cache.lookup(GOAL, *ROLE, reserve=True)
+        pending = cache.lookup(GOAL, *ROLE)
+
+        cache.release(GOAL, *ROLE, RuntimeError("judge failed"))
+
+        with self.assertRaisesRegex(RuntimeError, "judge failed"):
+            await pending
+        self.assertIsNone(cache.lookup(GOAL, *ROLE))
+
+    async def test_near_duplicates_are_stored_once(self):
+        cache = self.make_cache()
+        cache.add(GOAL, *ROLE, EVALUATION)
+        cache.add(GOAL, *ROLE, EVALUATION)
+
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    async def test_entries_persist_across_instances(self):
+        cache = self.make_cache(judge_fingerprint="judge-a")
+        cache.add(GOAL, *ROLE, EVALUATION)
+        cache.close()
+
+        reloaded = self.make_cache(judge_fingerprint="judge-a")
+
+        self.assertEqual(reloaded.lookup(GOAL, *ROLE), EVALUATION)
+
+    async def test_text_format_returns_models_from_every_path(self):
+        cache = self.make_cache(text_format=GoalEvaluation)
+        cache.lookup(GOAL, *ROLE, reserve=True)
+        pending = cache.lookup(GOAL, *ROLE)
+        cache.add(GOAL, *ROLE, EVALUATION)
+        cache.close()
+        reloaded = self.make_cache(text_format=GoalEvaluation)
+
+        results = [
+            await pending,
+            cache.lookup(NEAR_DUPLICATE, *ROLE),
+            reloaded.lookup(GOAL, *ROLE),
+        ]
+
+        for result in results:
+            self.assertIsInstance(result, GoalEvaluation)
+            self.assertEqual(result.model_dump(), EVALUATION)
+
+    async def test_changed_judge_fingerprint_discards_the_files(self):
+        cache = self.make_cache(judge_fingerprint="judge-a")
+        cache.add(GOAL, *ROLE, EVALUATION)
+        cache.close()
+
+        with self.assertLogs("utils.goal_cache", "WARNING"):
+            reloaded = self.make_cache(judge_fingerprint="judge-b")
+
+        self.assertEqual(reloaded.stats()["entries"], 0)
+        self.assertIsNone(reloaded.lookup(GOAL, *ROLE))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.cache_dir, SemanticGoalCache.ENTRIES_FILE))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
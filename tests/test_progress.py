@@ -0,0 +1,32 @@
+import io
+import unittest
+
+from utils.progress import BatchProgress, ProgressReporter
+
+
+class ProgressReporterTest(unittest.TestCase):
+    def test_logs_snapshots_when_not_on_a_terminal(self):
+        progress = BatchProgress()
+        progress.add_total("generate_employee_goals", 2)
+        progress.start("generate_employee_goals")
+        progress.finish("generate_employee_goals", tokens=100)
+        stream = io.StringIO()
+        reporter = ProgressReporter(
+            progress, interval=0.01, stream=stream, log_interval=60.0
+        )
+
+        with self.assertLogs("utils.progress", "INFO") as logs:
+            reporter.start()
+            reporter.stop()
+
+        # only the final snapshot, the interval is the coarse log interval
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.getMessage(), "batch_progress")
+        stats = record.stages["generate_employee_goals"]
+        self.assertEqual((stats["total"], stats["completed"]), (2, 1))
+        self.assertEqual(stream.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
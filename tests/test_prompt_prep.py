@@ -0,0 +1,44 @@
+import unittest
+
+from task_configs.prompt_prep import estimate_tokens, truncate_to_token_budget
+
+PRIORITIES = (
+    "Reduce P1 incident response time by 20% this quarter. "
+    "Move the billing service to the new platform before the end of Q3. "
+    "Grow the on-call rotation to eight engineers."
+)
+
+
+class TruncateToTokenBudgetTest(unittest.TestCase):
+    def test_text_within_budget_is_unchanged(self):
+        self.assertEqual(truncate_to_token_budget(PRIORITIES, 1_000), PRIORITIES)
+
+    def test_keeps_whole_leading_sentences(self):
+        sentences = [
+            "Reduce P1 incident response time by 20% this quarter.",
+            "Move the billing service to the new platform before the end of Q3.",
+        ]
+        first_two = " ".join(sentences)
+        # one extra token per sentence for the joining space
+        budget = sum(estimate_tokens(sentence) + 1 for sentence in sentences)
+
+        self.assertEqual(truncate_to_token_budget(PRIORITIES, budget), first_two)
+
+    def test_cuts_a_single_long_sentence_with_an_ellipsis(self):
+        sentence = "Improve the reliability of every internal service " * 20
+
+        truncated = truncate_to_token_budget(sentence, 10)
+
+        self.assertTrue(truncated.endswith("..."))
+        self.assertTrue(sentence.startswith(truncated[:-3]))
+
+    def test_result_never_exceeds_the_budget(self):
+        for text in (PRIORITIES, "word " * 200, "x" * 500):
+            for max_tokens in (5, 12, 30, 60):
+                with self.subTest(text=text[:20], max_tokens=max_tokens):
+                    truncated = truncate_to_token_budget(text, max_tokens)
+                    self.assertLessEqual(estimate_tokens(truncated), max_tokens)
+
+
+if __name__ == "__main__":
+    unittest.main()
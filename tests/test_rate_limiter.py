@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from time import monotonic
+
+from llm_interface.rate_limiter import RequestLimiter
+
+
+class RequestLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_caps_requests_in_flight(self):
+        limiter = RequestLimiter(max_concurrency=3)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def request():
+            nonlocal in_flight, max_in_flight
+            async with limiter.limit():
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(request() for _ in range(10)))
+
+        self.assertEqual(max_in_flight, 3)
+
+    async def test_unbounded_limiter_does_not_wait(self):
+        limiter = RequestLimiter()
+        start_time = monotonic()
+
+        for _ in range(100):
+            async with limiter.limit(1_000_000):
+                pass
+
+        self.assertLess(monotonic() - start_time, 0.05)
+
+    async def test_waits_for_tokens_once_the_bucket_is_empty(self):
+        # 1000 tokens per second, starting with a full bucket of 60000
+        limiter = RequestLimiter(tokens_per_minute=60_000)
+        start_time = monotonic()
+
+        async with limiter.limit(60_000):
+            self.assertLess(monotonic() - start_time, 0.05)
+        async with limiter.limit(200):
+            pass
+
+        self.assertGreaterEqual(monotonic() - start_time, 0.19)
+
+    async def test_request_larger_than_the_quota_waits_for_a_full_bucket(self):
+        limiter = RequestLimiter(tokens_per_minute=60_000)
+        start_time = monotonic()
+
+        async with limiter.limit(120_000):
+            pass
+
+        self.assertLess(monotonic() - start_time, 0.05)
+
+    async def test_waiters_are_served_in_arrival_order(self):
+        limiter = RequestLimiter(tokens_per_minute=60_000)
+        order = []
+
+        async def request(name, tokens):
+            async with limiter.limit(tokens):
+                order.append(name)
+
+        async with limiter.limit(60_000):
+            pass
+        await asyncio.gather(request("first", 100), request("second", 10))
+
+        self.assertEqual(order, ["first", "second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
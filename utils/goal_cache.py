@@ -0,0 +1,412 @@
+# Semantic near-duplicate cache for LLM judge evaluations.
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9%$]+")
+
+
+class HashingEmbedder:
+    """
+    Local stand-in embedder based on signed feature hashing.
+
+    Word unigrams and bigrams are hashed into a fixed-size vector, so goals that
+    share most of their wording end up close in cosine space. Any object with an
+    `embed(text) -> np.ndarray` method and a `dim` attribute can replace it;
+    its `name` identifies the embedding scheme in the cache metadata.
+    """
+
+    name = "hashing-blake2b-v1"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        bigrams = [f"{a} {b}" for a, b in itertools.pairwise(tokens)]
+        return tokens + bigrams
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if (value >> 63) & 1 else -1.0
+            vector[value % self.dim] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+def make_bucket_key(job_title, seniority_level, team_function=None) -> str:
+    """
+    Build the role, seniority and team bucket a goal evaluation is shared
+    within, i.e. every employee field the judge prompt uses besides the goal.
+    """
+
+    def normalize(value) -> str:
+        if not isinstance(value, str) or not value.strip():
+            return "unknown"
+        return " ".join(value.lower().split())
+
+    return "|".join(
+        normalize(value) for value in (job_title, seniority_level, team_function)
+    )
+
+
+def judge_fingerprint(llm_input_args_config: dict) -> str:
+    """
+    Hash the judge settings an evaluation depends on (model, prompts, sampling
+    parameters and output schema), so a changed judge invalidates the cache.
+    """
+    judge = {
+        key: value
+        for key, value in llm_input_args_config.items()
+        if key not in ("timeout", "text_format")
+    }
+    judge["schema"] = llm_input_args_config["text_format"].model_json_schema()
+    return hashlib.sha256(
+        json.dumps(judge, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+class SemanticGoalCache:
+    """
+    Reuse judge evaluations for goals that are near-duplicates of goals
+    already evaluated for the same role, seniority and team bucket.
+
+    Embeddings are stored in a memory-mapped float32 matrix and evaluations in
+    an append-only JSON lines file, so the cache survives across runs. With a
+    `text_format`, evaluations are kept and returned as instances of that
+    model, whether they come from the cache or from a pending reservation;
+    otherwise they are plain dicts. A
+    metadata file records the embedder, dimension, capacity and judge
+    fingerprint the files were written with; a cache written with a different
+    embedder, dimension or judge is discarded, and a changed capacity resizes
+    the files.
+    Approximate nearest-neighbour search uses random-hyperplane LSH over several
+    hash tables: candidates are taken from the query's signature bucket and
+    every bucket one bit away in each table, then ranked by exact cosine
+    similarity.
+
+    Goals whose evaluation is still in flight are indexed the same way, so
+    concurrent near-duplicates wait for the first judge call instead of
+    issuing their own (see `lookup` with `reserve=True`).
+    """
+
+    VECTORS_FILE = "goal_vectors.f32"
+    ENTRIES_FILE = "goal_entries.jsonl"
+    META_FILE = "cache_meta.json"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        similarity_threshold: float = 0.92,
+        embedding_dim: int = 256,
+        capacity: int = 100_000,
+        num_hyperplanes: int = 8,
+        num_tables: int = 4,
+        seed: int = 0,
+        embedder=None,
+        judge_fingerprint: str = "",
+        text_format: type[BaseModel] | None = None,
+    ):
+        self.cache_dir = cache_dir
+        self.similarity_threshold = similarity_threshold
+        self.capacity = capacity
+        self.embedder = embedder or HashingEmbedder(embedding_dim)
+        self.dim = self.embedder.dim
+        self.judge_fingerprint = judge_fingerprint
+        self.text_format = text_format
+        self.hits = 0
+        self.pending_hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._hyperplanes = (
+            np.random.default_rng(seed)
+            .standard_normal((num_tables, num_hyperplanes, self.dim))
+            .astype(np.float32)
+        )
+        self._num_hyperplanes = num_hyperplanes
+        self._bit_weights = 1 << np.arange(num_hyperplanes, dtype=np.int64)
+
+        vectors_path = os.path.join(cache_dir, self.VECTORS_FILE)
+        self._entries_path = os.path.join(cache_dir, self.ENTRIES_FILE)
+        # opened on the first add and kept open, flushed by flush()
+        self._entries_file = None
+        self._check_metadata(vectors_path)
+        self._vectors = np.memmap(
+            vectors_path,
+            dtype=np.float32,
+            mode="r+" if os.path.exists(vectors_path) else "w+",
+            shape=(capacity, self.dim),
+        )
+        # models with a text_format, JSON strings otherwise
+        self._evaluations: list[BaseModel | str] = []
+        self._index: dict[tuple[str, int, int], list[int]] = {}
+        # goals being evaluated: reservation id -> (vector, future)
+        self._pending: dict[int, tuple[np.ndarray, asyncio.Future]] = {}
+        self._pending_index: dict[tuple[str, int, int], list[int]] = {}
+        self._reservations: dict[tuple[str, str], int] = {}
+        self._next_reservation = 0
+        self._load_entries()
+
+    def _metadata(self) -> dict:
+        return {
+            "embedder": getattr(self.embedder, "name", type(self.embedder).__name__),
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "judge": self.judge_fingerprint,
+        }
+
+    def _check_metadata(self, vectors_path: str):
+        """
+        Discard or resize existing cache files that were written with other
+        settings, then record the current ones.
+        """
+        meta_path = os.path.join(self.cache_dir, self.META_FILE)
+        metadata = self._metadata()
+        has_files = os.path.exists(vectors_path) or os.path.exists(self._entries_path)
+        stored = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                stored = json.load(f)
+
+        if has_files and stored is None:
+            mismatch = "no metadata"
+        else:
+            mismatch = ", ".join(
+                f"{key} {stored[key]!r} -> {metadata[key]!r}"
+                for key in ("embedder", "dim", "judge")
+                if stored and stored.get(key) != metadata[key]
+            )
+        if mismatch:
+            logger.warning(
+                f"Discarding goal evaluation cache in {self.cache_dir} ({mismatch})."
+            )
+            for path in (vectors_path, self._entries_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        elif stored and stored["capacity"] != self.capacity:
+            logger.info(
+                f"Resizing goal evaluation cache from {stored['capacity']} to "
+                f"{self.capacity} entries."
+            )
+            if self.capacity < stored["capacity"]:
+                self._truncate(vectors_path)
+
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+    def _truncate(self, vectors_path: str):
+        if os.path.exists(vectors_path):
+            os.truncate(vectors_path, self.capacity * self.dim * 4)
+        if os.path.exists(self._entries_path):
+            with open(self._entries_path, encoding="utf-8") as f:
+                lines = [line for _, line in zip(range(self.capacity), f)]
+            with open(self._entries_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+
+    def _load_entries(self):
+        if not os.path.exists(self._entries_path):
+            return
+        with open(self._entries_path, encoding="utf-8") as f:
+            for line in f:
+                if len(self._evaluations) >= self.capacity:
+                    break
+                entry = json.loads(line)
+                row = len(self._evaluations)
+                self._evaluations.append(
+                    self.text_format.model_validate(entry["evaluation"])
+                    if self.text_format
+                    else json.dumps(entry["evaluation"])
+                )
+                self._index_row(entry["bucket"], self._vectors[row], row)
+        logger.info(
+            f"Loaded {len(self._evaluations)} cached goal evaluations from {self.cache_dir}."
+        )
+
+    def _signatures(self, vector: np.ndarray) -> list[int]:
+        bits = (self._hyperplanes @ vector) > 0
+        return [int(signature) for signature in bits @ self._bit_weights]
+
+    def _index_row(self, bucket: str, vector: np.ndarray, row: int, index=None):
+        index = self._index if index is None else index
+        for table, signature in enumerate(self._signatures(vector)):
+            index.setdefault((bucket, table, signature), []).append(row)
+
+    def _candidate_rows(self, bucket: str, vector: np.ndarray, index=None) -> list[int]:
+        index = self._index if index is None else index
+        rows = set()
+        for table, signature in enumerate(self._signatures(vector)):
+            rows.update(index.get((bucket, table, signature), []))
+            for bit in range(self._num_hyperplanes):
+                probe = signature ^ (1 << bit)
+                rows.update(index.get((bucket, table, probe), []))
+        return sorted(rows)
+
+    def _nearest_row(self, bucket: str, vector: np.ndarray) -> int | None:
+        rows = self._candidate_rows(bucket, vector)
+        if rows:
+            similarities = self._vectors[rows] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                return rows[best]
+        return None
+
+    def _nearest_pending(self, bucket: str, vector: np.ndarray) -> int | None:
+        reservations = self._candidate_rows(bucket, vector, self._pending_index)
+        if reservations:
+            similarities = (
+                np.stack([self._pending[i][0] for i in reservations]) @ vector
+            )
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                return reservations[best]
+        return None
+
+    def lookup(
+        self,
+        goal: str,
+        job_title,
+        seniority_level,
+        team_function=None,
+        reserve: bool = False,
+    ) -> dict | asyncio.Future | None:
+        """
+        Find the evaluation of the most similar goal in the same bucket.
+
+        Returns the cached evaluation (a `text_format` model, or a copy as a
+        dict) if one is above the similarity threshold. Otherwise, if a near-duplicate goal is being evaluated,
+        returns a future of its evaluation to await. Returns None on a miss;
+        with `reserve`, the goal is then registered as being evaluated and the
+        caller must `add` its evaluation or `release` it on failure.
+        """
+        bucket = make_bucket_key(job_title, seniority_level, team_function)
+        vector = self.embedder.embed(goal)
+        row = self._nearest_row(bucket, vector)
+        if row is not None:
+            self.hits += 1
+            evaluation = self._evaluations[row]
+            return evaluation if self.text_format else json.loads(evaluation)
+        reservation = self._nearest_pending(bucket, vector)
+        if reservation is not None:
+            self.pending_hits += 1
+            return self._pending[reservation][1]
+        self.misses += 1
+        if reserve:
+            reservation = self._next_reservation
+            self._next_reservation += 1
+            self._pending[reservation] = (
+                vector,
+                asyncio.get_running_loop().create_future(),
+            )
+            self._index_row(bucket, vector, reservation, self._pending_index)
+            self._reservations[(bucket, goal)] = reservation
+        return None
+
+    def _pop_reservation(self, bucket: str, goal: str) -> asyncio.Future | None:
+        reservation = self._reservations.pop((bucket, goal), None)
+        if reservation is None:
+            return None
+        vector, future = self._pending.pop(reservation)
+        for table, signature in enumerate(self._signatures(vector)):
+            key = (bucket, table, signature)
+            self._pending_index[key].remove(reservation)
+            if not self._pending_index[key]:
+                del self._pending_index[key]
+        return future
+
+    def release(
+        self, goal: str, job_title, seniority_level, team_function, error: BaseException
+    ):
+        """
+        Drop the reservation of a goal whose evaluation failed; lookups
+        waiting on it get `error`.
+        """
+        bucket = make_bucket_key(job_title, seniority_level, team_function)
+        future = self._pop_reservation(bucket, goal)
+        if future is not None and not future.done():
+            future.set_exception(error)
+            # mark the error as retrieved in case nobody was waiting on it
+            future.exception()
+
+    def add(
+        self,
+        goal: str,
+        job_title,
+        seniority_level,
+        team_function,
+        evaluation: dict | BaseModel,
+    ):
+        """
+        Store the evaluation of a goal for later near-duplicate lookups and
+        hand it to lookups waiting on its reservation. Dicts are validated into
+        `text_format` models if one is set. Goals with a stored near-duplicate
+        are not stored again.
+        """
+        if self.text_format and not isinstance(evaluation, self.text_format):
+            evaluation = self.text_format.model_validate(evaluation)
+        bucket = make_bucket_key(job_title, seniority_level, team_function)
+        future = self._pop_reservation(bucket, goal)
+        if future is not None and not future.done():
+            future.set_result(evaluation)
+        vector = self.embedder.embed(goal)
+        if self._nearest_row(bucket, vector) is not None:
+            return
+        row = len(self._evaluations)
+        if row >= self.capacity:
+            logger.warning("Goal cache is full; new evaluations are not cached.")
+            return
+        evaluation_json = (
+            evaluation.model_dump_json()
+            if isinstance(evaluation, BaseModel)
+            else json.dumps(evaluation)
+        )
+        self._vectors[row] = vector
+        self._evaluations.append(evaluation if self.text_format else evaluation_json)
+        self._index_row(bucket, vector, row)
+        if self._entries_file is None:
+            self._entries_file = open(self._entries_path, "a", encoding="utf-8")  # noqa: SIM115
+        self._entries_file.write(
+            f'{{"bucket": {json.dumps(bucket)}, "goal": {json.dumps(goal)}, '
+            f'"evaluation": {evaluation_json}}}\n'
+        )
+
+    def flush(self):
+        self._vectors.flush()
+        if self._entries_file is not None:
+            self._entries_file.flush()
+
+    def close(self):
+        self.flush()
+        if self._entries_file is not None:
+            self._entries_file.close()
+            self._entries_file = None
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.hits + self.pending_hits
+        lookups = hits + self.misses
+        return round(hits / lookups, 4) if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._evaluations),
+            "hits": self.hits,
+            "pending_hits": self.pending_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "similarity_threshold": self.similarity_threshold,
+        }
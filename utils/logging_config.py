@@ -0,0 +1,171 @@
+# Logging is configured once per process; modules only call logging.getLogger.
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter
+
+from task_configs.config import LOGGING_CONFIG
+
+# attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_call_loggers = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line, including any fields passed
+    through `extra`, e.g. employee_id, task, latency_ms and tokens.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                event[key] = value
+        if record.exc_info:
+            event["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str)
+
+
+class _StderrHandler(logging.StreamHandler):
+    """
+    Stream handler writing to whatever sys.stderr is at emit time, so the
+    terminal progress display (utils.progress.ProgressReporter) can keep log
+    lines from being drawn over.
+    """
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+def configure_logging(
+    level: str = LOGGING_CONFIG["level"],
+    json_format: bool = LOGGING_CONFIG["json_format"],
+):
+    """
+    Configure the root logger once for the whole process.
+
+    Records are put on an in-memory queue by a QueueHandler and written by a
+    QueueListener thread, so log I/O never blocks the caller (or the event loop).
+    Calling it again is a no-op.
+    Args:
+        level (str): Root log level.
+        json_format (bool): Emit structured JSON lines instead of plain text.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = _StderrHandler()
+    if json_format:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        )
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.handlers = [QueueHandler(log_queue)]
+    root_logger.setLevel(level)
+    # the OpenAI SDK logs every HTTP request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+class CallLogger:
+    """
+    Log LLM calls of one task with sampling and periodic throughput lines.
+
+    Each call is logged as a structured event with probability `sample_rate`;
+    every `progress_interval` seconds a progress line with the call count and
+    throughput since the first call replaces the rest.
+    """
+
+    def __init__(
+        self,
+        task: str,
+        sample_rate: float = LOGGING_CONFIG["call_log_sample_rate"],
+        progress_interval: float = LOGGING_CONFIG["progress_interval"],
+    ):
+        self.task = task
+        self.sample_rate = sample_rate
+        self.progress_interval = progress_interval
+        self.logger = logging.getLogger(f"llm_calls.{task}")
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._start_time = None
+        self._last_progress_time = None
+
+    def record(
+        self, latency: float, input_tokens: int, output_tokens: int, employee_id=None
+    ):
+        now = perf_counter()
+        if self._start_time is None:
+            self._start_time = self._last_progress_time = now
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+        if random.random() < self.sample_rate:
+            self.logger.info(
+                "llm_call",
+                extra={
+                    "task": self.task,
+                    "employee_id": employee_id,
+                    "latency_ms": round(latency * 1000, 1),
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                },
+            )
+        if now - self._last_progress_time >= self.progress_interval:
+            self._last_progress_time = now
+            self.log_progress()
+
+    def log_progress(self):
+        elapsed = perf_counter() - self._start_time if self._start_time else 0.0
+        self.logger.info(
+            "llm_progress",
+            extra={
+                "task": self.task,
+                "calls": self.calls,
+                "elapsed_s": round(elapsed, 1),
+                "calls_per_s": round(self.calls / elapsed, 2) if elapsed else 0.0,
+                "tokens_per_s": round(
+                    (self.input_tokens + self.output_tokens) / elapsed, 1
+                )
+                if elapsed
+                else 0.0,
+            },
+        )
+
+
+def get_call_logger(task: str) -> CallLogger:
+    """
+    Get the shared CallLogger of a task, creating it on first use.
+    """
+    if task not in _call_loggers:
+        _call_loggers[task] = CallLogger(task)
+    return _call_loggers[task]
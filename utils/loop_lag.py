@@ -0,0 +1,52 @@
+import asyncio
+
+import numpy as np
+
+
+class EventLoopLagMonitor:
+    """
+    Measure event loop lag while a block of async code runs.
+
+    A background task sleeps for `interval` seconds in a loop and records how
+    late it wakes up. Large values mean callbacks (like reading sockets) are
+    delayed by CPU work running on the loop thread.
+
+    Usage:
+        async with EventLoopLagMonitor() as lag_monitor:
+            await batch_generate(...)
+        print(lag_monitor.summary())
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_wakeup = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected_wakeup))
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self) -> dict:
+        if not self.lags:
+            return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        lags_ms = np.array(self.lags) * 1000
+        return {
+            "samples": len(lags_ms),
+            "mean_ms": round(float(lags_ms.mean()), 2),
+            "p99_ms": round(float(np.percentile(lags_ms, 99)), 2),
+            "max_ms": round(float(lags_ms.max()), 2),
+        }
@@ -0,0 +1,58 @@
+# Priority keys for scheduling employees in streaming batch runs.
+# A key maps (employee_data, prompt_dict) to a sortable value, lowest first.
+
+
+def shortest_prompt_first(employee_data: dict, prompt_dict: dict) -> int:
+    return prompt_dict.get("estimated_input_tokens", 0)
+
+
+def teams_first(teams: list[str]):
+    """
+    Schedule employees of the given teams first, in the order of `teams`.
+    """
+    team_rank = {team: rank for rank, team in enumerate(teams)}
+
+    def key(employee_data: dict, prompt_dict: dict) -> int:
+        return team_rank.get(employee_data.get("team_function"), len(teams))
+
+    return key
+
+
+def employees_first(employee_ids):
+    """
+    Schedule the given employees (e.g. VIPs) before everyone else.
+    """
+    employee_ids = set(employee_ids)
+
+    def key(employee_data: dict, prompt_dict: dict) -> int:
+        return 0 if employee_data.get("employee_id") in employee_ids else 1
+
+    return key
+
+
+def combine_priorities(*keys):
+    """
+    Combine priority keys, later keys breaking ties of earlier ones.
+
+    Usage:
+        combine_priorities(employees_first(vip_ids), shortest_prompt_first)
+    """
+
+    def key(employee_data: dict, prompt_dict: dict) -> tuple:
+        return tuple(k(employee_data, prompt_dict) for k in keys)
+
+    return key
+
+
+def compute_priorities(
+    priority_key, employee_dict_list: list[dict], prompt_dict_list: list[dict]
+) -> list | None:
+    """
+    Evaluate a priority key for every employee, or None if no key is given.
+    """
+    if priority_key is None:
+        return None
+    return [
+        priority_key(employee_data, prompt_dict)
+        for employee_data, prompt_dict in zip(employee_dict_list, prompt_dict_list)
+    ]
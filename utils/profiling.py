@@ -0,0 +1,176 @@
+# Stage timing spans and optional profilers for pipeline runs.
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from time import perf_counter, thread_time
+
+PROFILERS = ["cprofile", "sample"]
+# spans around awaited calls, overlapping across concurrent requests
+CONCURRENT_STAGES = {"dispatch", "parse_offloaded"}
+
+_NO_SPAN = nullcontext()
+
+
+class StageTimer:
+    """
+    Accumulate wall and CPU time of named pipeline stages.
+
+    CPU time is measured for the calling thread only. Spans around awaited
+    calls (CONCURRENT_STAGES) overlap across concurrent requests, so their wall
+    time is a sum over requests rather than a share of the run, and their CPU
+    time includes whatever else ran on the event loop meanwhile; the report
+    leaves both columns out for them.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages: dict[str, list] = {}
+
+    @contextmanager
+    def _span(self, name: str):
+        start_wall = perf_counter()
+        start_cpu = thread_time()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += perf_counter() - start_wall
+            stage[2] += thread_time() - start_cpu
+
+    def span(self, name: str):
+        return self._span(name) if self.enabled else _NO_SPAN
+
+    def report(self, total_wall: float) -> str:
+        lines = [
+            f"{'stage':<16}{'calls':>10}{'wall_s':>12}{'cpu_s':>12}{'wall_%':>9}",
+        ]
+        for name, (calls, wall, cpu) in sorted(
+            self.stages.items(), key=lambda item: -item[1][1]
+        ):
+            if name in CONCURRENT_STAGES:
+                lines.append(f"{name:<16}{calls:>10}{wall:>12.3f}{'-':>12}{'-':>9}")
+                continue
+            share = wall / total_wall * 100 if total_wall else 0.0
+            lines.append(f"{name:<16}{calls:>10}{wall:>12.3f}{cpu:>12.3f}{share:>9.1f}")
+        lines.append(f"{'total':<16}{'':>10}{total_wall:>12.3f}")
+        return "\n".join(lines)
+
+
+_stage_timer = StageTimer()
+
+
+def stage(name: str):
+    """
+    Time a pipeline stage when profiling is on; a no-op otherwise.
+
+    Usage:
+        with stage("prompt_prep"):
+            prompt_dicts = [...]
+    """
+    return _stage_timer.span(name)
+
+
+class SamplingProfiler:
+    """
+    Sample the Python stack of one thread at a fixed interval and count
+    collapsed stacks ("module:function;module:function"), the input format of
+    flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stack_counts = Counter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                stack.append(f"{module}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stack_counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def write_folded(self, file_path: str):
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.writelines(
+                f"{stack} {count}\n" for stack, count in self.stack_counts.most_common()
+            )
+
+
+def add_profile_arguments(parser):
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each pipeline stage and print a per-stage breakdown.",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=PROFILERS,
+        help="Also run under cProfile (.prof) or a sampling profiler (.folded).",
+    )
+
+
+@contextmanager
+def profiling_session(
+    profile: bool, profiler: str | None, output_dir: str, name: str = "profile"
+):
+    """
+    Profile the code run inside the block.
+
+    With `profile`, stage spans are recorded and a per-stage breakdown is
+    printed at the end. `profiler` additionally runs cProfile, writing
+    <output_dir>/<name>.prof, or the sampling profiler, writing the
+    flamegraph-compatible <output_dir>/<name>.folded.
+    """
+    if not profile and profiler is None:
+        yield
+        return
+
+    _stage_timer.enabled = True
+    cprofile = cProfile.Profile() if profiler == "cprofile" else None
+    sampler = SamplingProfiler(threading.get_ident()) if profiler == "sample" else None
+    if cprofile:
+        cprofile.enable()
+    if sampler:
+        sampler.start()
+    start_time = perf_counter()
+    try:
+        yield
+    finally:
+        total_wall = perf_counter() - start_time
+        if cprofile:
+            cprofile.disable()
+        if sampler:
+            sampler.stop()
+        _stage_timer.enabled = False
+
+        os.makedirs(output_dir, exist_ok=True)
+        print("\nPer-stage breakdown:")
+        print(_stage_timer.report(total_wall))
+        if cprofile:
+            file_path = os.path.join(output_dir, name + ".prof")
+            cprofile.dump_stats(file_path)
+            print(f"\ncProfile stats saved to {file_path}")
+            pstats.Stats(cprofile).sort_stats("cumulative").print_stats(25)
+        if sampler:
+            file_path = os.path.join(output_dir, name + ".folded")
+            sampler.write_folded(file_path)
+            print(f"\nCollapsed stacks for flamegraphs saved to {file_path}")
@@ -0,0 +1,283 @@
+# Live progress, throughput and ETA of batch runs.
+import json
+import logging
+import sys
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic
+
+from task_configs.config import PROGRESS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class StageProgress:
+    """
+    Counters of one stage (task) of a batch run.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.tokens = 0
+        self.start_time = None
+        # (timestamp, tokens) of recent completions, for rolling rates
+        self.recent = deque()
+
+
+class BatchProgress:
+    """
+    Track completed, failed and in-flight requests per stage of a batch run.
+
+    Rates are computed over a rolling window of `window` seconds, and the ETA
+    of a stage is its remaining requests divided by its rolling request rate.
+    Updates come from the event loop thread and snapshots may be taken from
+    reporter or HTTP threads, so all access goes through a lock.
+    """
+
+    def __init__(self, window: float = PROGRESS_CONFIG["rolling_window"]):
+        self.window = window
+        self.concurrency_limit = None
+        self.stages: dict[str, StageProgress] = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, stage: str) -> StageProgress:
+        if stage not in self.stages:
+            self.stages[stage] = StageProgress()
+        return self.stages[stage]
+
+    def add_total(self, stage: str, count: int):
+        with self._lock:
+            stage_progress = self._stage(stage)
+            stage_progress.total += count
+            if stage_progress.start_time is None:
+                stage_progress.start_time = monotonic()
+
+    def start(self, stage: str):
+        with self._lock:
+            self._stage(stage).in_flight += 1
+
+    def finish(self, stage: str, tokens: int = 0):
+        with self._lock:
+            stage_progress = self._stage(stage)
+            stage_progress.in_flight -= 1
+            stage_progress.completed += 1
+            stage_progress.tokens += tokens
+            stage_progress.recent.append((monotonic(), tokens))
+
+    def fail(self, stage: str):
+        with self._lock:
+            stage_progress = self._stage(stage)
+            stage_progress.in_flight -= 1
+            stage_progress.failed += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return the current counters, rolling rates and ETA of every stage.
+        """
+        now = monotonic()
+        snapshot = {"concurrency_limit": self.concurrency_limit, "stages": {}}
+        with self._lock:
+            for stage, stage_progress in self.stages.items():
+                recent = stage_progress.recent
+                while recent and recent[0][0] < now - self.window:
+                    recent.popleft()
+                elapsed = min(self.window, now - (stage_progress.start_time or now))
+                requests_per_s = len(recent) / elapsed if elapsed > 0 else 0.0
+                tokens_per_s = (
+                    sum(tokens for _, tokens in recent) / elapsed
+                    if elapsed > 0
+                    else 0.0
+                )
+                remaining = (
+                    stage_progress.total
+                    - stage_progress.completed
+                    - stage_progress.failed
+                )
+                snapshot["stages"][stage] = {
+                    "total": stage_progress.total,
+                    "completed": stage_progress.completed,
+                    "failed": stage_progress.failed,
+                    "in_flight": stage_progress.in_flight,
+                    "requests_per_s": round(requests_per_s, 2),
+                    "tokens_per_s": round(tokens_per_s, 1),
+                    "eta_s": round(remaining / requests_per_s, 1)
+                    if requests_per_s
+                    else None,
+                }
+        return snapshot
+
+    def render(self) -> str:
+        """
+        Render the snapshot as a few lines of text for the terminal.
+        """
+        snapshot = self.snapshot()
+        limit = snapshot["concurrency_limit"] or "unbounded"
+        lines = [f"concurrency limit: {limit}"]
+        for stage, stats in snapshot["stages"].items():
+            eta = f"{stats['eta_s']:.0f}s" if stats["eta_s"] is not None else "?"
+            lines.append(
+                f"{stage}: {stats['completed']}/{stats['total']} done, "
+                f"{stats['failed']} failed, {stats['in_flight']} in flight | "
+                f"{stats['requests_per_s']:.1f} req/s, "
+                f"{stats['tokens_per_s']:.0f} tok/s | ETA {eta}"
+            )
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        """
+        Render the snapshot in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        if snapshot["concurrency_limit"]:
+            lines.append(f"batch_concurrency_limit {snapshot['concurrency_limit']}")
+        for stage, stats in snapshot["stages"].items():
+            for name, value in stats.items():
+                if value is not None:
+                    lines.append(f'batch_{name}{{stage="{stage}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+_progress = BatchProgress()
+
+
+def get_progress() -> BatchProgress:
+    """
+    Get the process-wide progress tracker of batch runs.
+    """
+    return _progress
+
+
+class _FrameAwareStream:
+    """
+    Stand-in for sys.stdout and sys.stderr while a progress frame is on the
+    terminal. The frame is cleared before any other output is written, and
+    redrawn below it on the next tick, so prints and log lines are never
+    overwritten by the frame.
+    """
+
+    def __init__(self, reporter: "ProgressReporter", stream):
+        self._reporter = reporter
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        with self._reporter._lock:
+            self._reporter._clear()
+            written = self._stream.write(text)
+            self._stream.flush()
+            if text:
+                self._reporter._at_line_start = text.endswith("\n")
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class ProgressReporter:
+    """
+    Redraw the progress of a batch run on the terminal from a background thread.
+
+    Running in its own thread keeps the display updating even when the event
+    loop is stalled, which is exactly when it is needed. On a terminal,
+    sys.stdout and sys.stderr are routed through the reporter while it runs,
+    so other output clears the frame first instead of being drawn over. When
+    the stream is not a terminal, nothing is drawn; the snapshot is logged as
+    one "batch_progress" event every `log_interval` seconds instead, so it
+    fits in with the JSON log lines.
+    """
+
+    def __init__(
+        self,
+        progress: BatchProgress,
+        interval: float = PROGRESS_CONFIG["render_interval"],
+        stream=sys.stderr,
+        log_interval: float = PROGRESS_CONFIG["log_interval"],
+    ):
+        self.progress = progress
+        self.stream = stream
+        self._interactive = stream.isatty()
+        self.interval = interval if self._interactive else log_interval
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._lock = threading.RLock()
+        self._lines_drawn = 0
+        self._at_line_start = True
+        self._original_streams = None
+
+    def _clear(self):
+        if self._lines_drawn:
+            # move the cursor back up and clear the previous frame
+            self.stream.write(f"\x1b[{self._lines_drawn}F\x1b[J")
+            self.stream.flush()
+            self._lines_drawn = 0
+
+    def _draw(self):
+        if not self._interactive:
+            logger.info("batch_progress", extra=self.progress.snapshot())
+            return
+        text = self.progress.render()
+        with self._lock:
+            # never draw into the middle of a line being printed
+            if not self._at_line_start:
+                return
+            self._clear()
+            self.stream.write(text + "\n")
+            self.stream.flush()
+            self._lines_drawn = text.count("\n") + 1
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._draw()
+
+    def start(self):
+        if self._interactive:
+            self._original_streams = (sys.stdout, sys.stderr)
+            sys.stdout = _FrameAwareStream(self, sys.stdout)
+            sys.stderr = _FrameAwareStream(self, sys.stderr)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        if self._original_streams:
+            sys.stdout, sys.stderr = self._original_streams
+            self._original_streams = None
+        # the final frame stays on screen
+        self._draw()
+        self._lines_drawn = 0
+
+
+def serve_metrics(progress: BatchProgress, port: int, host: str = "127.0.0.1"):
+    """
+    Serve the progress on http://host:port/metrics (Prometheus text) and
+    /metrics.json from a daemon thread.
+    Returns:
+        ThreadingHTTPServer: Running server, call shutdown() to stop it.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = progress.to_prometheus()
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(progress.snapshot())
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server